@@ -9,6 +9,7 @@
         "data/inspection_cron_data.xml",
         "data/mail_template_data.xml",
         "views/res_partner_views.xml",
+        "views/res_users_views.xml",
         "views/inspection_portal_templates.xml",
         'security/ir.model.access.csv',
         'data/ir_sequence_data.xml',
@@ -17,6 +18,8 @@
         'views/inspection_category_views.xml',
         'views/inspection_machine_views.xml',
         'views/inspection_inspection_views.xml',
+        'views/inspection_certificate_job_views.xml',
+        'views/inspection_certificate_export_views.xml',
     ],
     'assets': {
         'web.assets_backend': [
@@ -32,6 +35,10 @@
             # NEW: Customer Dashboard
             'certification/static/src/dashboard/customer_dashboard.xml',
             'certification/static/src/dashboard/customer_dashboard.js',
+
+            # Checklist result widget
+            'certification/static/src/checklist/checklist_result_field.xml',
+            'certification/static/src/checklist/checklist_result_field.js',
         ],
     },
     'application': True,
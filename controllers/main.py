@@ -1,23 +1,84 @@
 # -*- coding: utf-8 -*-
 from odoo import http, _
-from odoo.http import request
+from odoo.http import request, content_disposition
+from odoo.exceptions import ValidationError
 from odoo.addons.portal.controllers.portal import CustomerPortal, pager as portal_pager
 import base64
 from datetime import datetime
+import hashlib
 import logging
+import time
+
+from werkzeug.urls import url_encode
+from werkzeug.wsgi import wrap_file
+
+from ..lib import certificate_qr
 
 _logger = logging.getLogger(__name__)
 
+# Per-worker rate limit of the QR-scanned public pages: {ip: (window_start, hits)}
+_PUBLIC_RATE_LIMIT = {}
+
 
 class InspectionController(http.Controller):
 
+    # 0. PUBLIC PAGE CACHE / RATE LIMIT
+    def _public_rate_limited(self):
+        """ Fixed one-minute window per client IP, ``certification.public_rate_limit`` hits (default 120) """
+        limit = int(request.env['ir.config_parameter'].sudo().get_param('certification.public_rate_limit', 120))
+        if limit <= 0:
+            return False
+        now = time.monotonic()
+        if len(_PUBLIC_RATE_LIMIT) > 10000:
+            for ip in [ip for ip, (start, _hits) in _PUBLIC_RATE_LIMIT.items() if now - start > 60]:
+                del _PUBLIC_RATE_LIMIT[ip]
+        ip = request.httprequest.remote_addr
+        start, hits = _PUBLIC_RATE_LIMIT.get(ip, (now, 0))
+        if now - start > 60:
+            start, hits = now, 0
+        _PUBLIC_RATE_LIMIT[ip] = (start, hits + 1)
+        return hits >= limit
+
+    def _conditional_public_page(self, page, record, validators, render):
+        """ Serve a public page with ETag / Last-Modified validation.
+
+        ``validators`` lists whatever the page shows that can change (write dates, compliance,
+        counts); it becomes the ETag, so a matching ``If-None-Match`` is answered with a 304
+        before any rendering. No Last-Modified is sent: a date cannot reflect every validator.
+        Pages are rendered per request and only cached by the client's own browser
+        (``private``): they embed session data such as the CSRF token.
+        """
+        if self._public_rate_limited():
+            return request.make_response(_('Too many requests, please try again in a minute.'),
+                                         headers=[('Retry-After', '60')], status=429)
+
+        is_public = request.env.user._is_public()
+        etag = hashlib.sha1(repr((page, record.id, request.env.lang, is_public or request.env.uid,
+                                  validators)).encode()).hexdigest()
+        headers = [
+            ('ETag', f'"{etag}"'),
+            ('Cache-Control', 'private, no-cache'),
+        ]
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response('', headers=headers, status=304)
+        return request.make_response(render().render(), headers=headers)
+
     # 1. PUBLIC CERTIFICATE VIEW
     @http.route('/inspection/view/<int:inspection_id>', type='http', auth='public', website=True)
     def view_inspection_certificate(self, inspection_id, **kwargs):
         inspection = request.env['inspection.inspection'].sudo().browse(inspection_id)
         if not inspection.exists():
             return request.render('http_routing.404')
-        return request.render('certification.public_inspection_view', {'inspection': inspection})
+        # Checklist results and evidence photos are shown too: their latest change and count
+        lines = request.env['inspection.inspection.line'].sudo().read_group(
+            [('inspection_id', '=', inspection.id)], ['write_date:max'], [])
+        images = request.env['inspection.inspection.image'].sudo().read_group(
+            [('line_id.inspection_id', '=', inspection.id)], ['write_date:max'], [])
+        validators = [inspection.write_date, inspection.machine_id.write_date, inspection.customer_id.write_date,
+                      lines[0]['write_date'], lines[0]['__count'], images[0]['write_date'], images[0]['__count']]
+        return self._conditional_public_page(
+            'inspection', inspection, validators,
+            lambda: request.render('certification.public_inspection_view', {'inspection': inspection}))
 
     # 2. PUBLIC MACHINE INFO
     @http.route('/machine/info/<int:machine_id>', type='http', auth='public', website=True)
@@ -25,7 +86,65 @@ class InspectionController(http.Controller):
         machine = request.env['inspection.machine'].sudo().browse(machine_id)
         if not machine.exists():
             return request.render('http_routing.404')
-        return request.render('certification.public_machine_info', {'machine': machine})
+        last_inspection = request.env['inspection.inspection'].sudo().search_fetch(
+            [('machine_id', '=', machine.id), ('status', '=', 'passed')], ['start_date', 'write_date'],
+            order='start_date desc', limit=1)
+        # A newly passed inspection changes last_inspection, an expiry flips is_compliant (nightly cron)
+        validators = [machine.write_date, machine.is_compliant, last_inspection.id,
+                      last_inspection.write_date or machine.write_date]
+        return self._conditional_public_page(
+            'machine', machine, validators,
+            lambda: request.render('certification.public_machine_info', {
+                'machine': machine,
+                'last_inspection': last_inspection,
+            }))
+
+    # 2b. SIGNED QR VERIFICATION
+    @http.route('/inspection/verify', type='http', auth='public', website=True, sitemap=False)
+    def verify_certificate(self, p='', format=None, **kwargs):
+        """ Online check of a signed QR payload (offline: lib/certificate_qr.py).
+
+        Browsers are sent to the certificate page; ``format=json`` returns the verdict, which
+        also tells whether the certificate changed since the QR code was printed.
+        """
+        if self._public_rate_limited():
+            return request.make_response(_('Too many requests, please try again in a minute.'),
+                                         headers=[('Retry-After', '60')], status=429)
+        if not certificate_qr.Ed25519PrivateKey:
+            return request.not_found()
+        Inspection = request.env['inspection.inspection'].sudo()
+        try:
+            public_key = certificate_qr.get_public_key(Inspection._get_qr_signing_key())
+            claims = certificate_qr.verify_payload(p, public_key)
+        except ValueError as e:
+            if format == 'json':
+                return request.make_json_response({'valid': False, 'error': str(e)})
+            return request.render('http_routing.404')
+
+        inspection = Inspection.browse(claims.get('i')).exists()
+        current = inspection and inspection.status == claims.get('st') and \
+            (inspection.expire_date.isoformat() if inspection.expire_date else '') == claims.get('e')
+        if format != 'json' and inspection:
+            return request.redirect(f'/inspection/view/{inspection.id}')
+        return request.make_json_response({
+            'valid': True,
+            'current': bool(current),
+            'expired': certificate_qr.is_expired(claims),
+            'reference': claims.get('r'),
+            'serial': claims.get('s'),
+            'status': inspection.status if inspection else 'deleted',
+            'expire_date': claims.get('e'),
+        })
+
+    @http.route('/inspection/verify/public_key', type='http', auth='public', sitemap=False)
+    def certificate_public_key(self, **kwargs):
+        if not certificate_qr.Ed25519PrivateKey:
+            return request.not_found()
+        key = request.env['inspection.inspection'].sudo()._get_qr_signing_key()
+        return request.make_response(certificate_qr.get_public_key(key), headers=[
+            ('Content-Type', 'text/plain'),
+            ('Cache-Control', 'public, max-age=86400'),
+        ])
 
     # 3. DOWNLOAD QR CODE
     @http.route('/inspection/qr_download/<int:inspection_id>', type='http', auth='user', website=True)
@@ -76,9 +195,129 @@ class InspectionController(http.Controller):
             'redirect_url': f'/inspection/view/{inspection.id}',
         }
 
+    # 5. RESUMABLE EVIDENCE PHOTO UPLOAD
+    @http.route('/inspection/photo/upload/start', type='json', auth='user')
+    def start_photo_upload(self, line_id, size, checksum, filename=None, description=None, **kwargs):
+        """ Open or resume an upload; the client continues from the returned offset """
+        line = request.env['inspection.inspection.line'].browse(int(line_id)).exists()
+        if not line:
+            return {'error': _('Question line not found.')}
+        line.check_access('write')
+
+        session = request.env['inspection.photo.upload'].sudo()._start(
+            line, filename, int(size), checksum, description)
+        return {
+            'token': session.token,
+            'offset': session.received,
+            'image_id': session.image_id.id,
+        }
+
+    @http.route('/inspection/photo/upload/<string:token>', type='http', auth='user', methods=['POST'], csrf=False)
+    def upload_photo_chunk(self, token, offset=0, **kwargs):
+        """ Append one multipart ``chunk`` at ``offset``; answers with the bytes received so far """
+        session = request.env['inspection.photo.upload'].sudo().search([('token', '=', token)], limit=1)
+        if not session:
+            return request.not_found()
+        session.line_id.with_env(request.env).check_access('write')
+
+        chunk = kwargs.get('chunk')
+        if not chunk:
+            return request.make_json_response({'error': 'Missing chunk.'}, status=400)
+        try:
+            received = session._append_chunk(int(offset), chunk.stream)
+        except ValidationError as e:
+            return request.make_json_response({'error': str(e), 'offset': session._get_disk_size()}, status=409)
+        return request.make_json_response({
+            'offset': received,
+            'image_id': session.image_id.id,
+            'state': session.image_id.state or 'uploading',
+        })
+
+    # 6. BULK CERTIFICATE EXPORT (ZIP)
+    @http.route('/certification/export/<int:export_id>/download', type='http', auth='user')
+    def download_certificate_export(self, export_id, **kwargs):
+        export = request.env['inspection.certificate.export'].sudo().browse(export_id)
+        user = request.env.user
+        if not export.exists() or not (user.has_group('base.group_user') or export.user_id == user):
+            return request.not_found()
+
+        # The archive is spooled to a temp file and sent in chunks
+        archive = export._build_zip()
+        archive.seek(0, 2)
+        size = archive.tell()
+        archive.seek(0)
+        filename = f"{export.name.replace('/', '_')}.zip"
+        return request.make_response(
+            wrap_file(request.httprequest.environ, archive),
+            headers=[
+                ('Content-Type', 'application/zip'),
+                ('Content-Length', str(size)),
+                ('Content-Disposition', content_disposition(filename)),
+            ]
+        )
+
 
 class MachineCustomerPortal(CustomerPortal):
 
+    # 0. KEYSET PAGINATION
+    def _keyset_domain(self, Model, order, after):
+        """ Domain selecting the rows after cursor ``after`` ("<value>~<id>") for ``order``,
+        or None if the cursor is malformed (it comes from the URL) """
+        value, _sep, last_id = after.rpartition('~')
+        if not last_id.isdigit() or int(last_id) > 2 ** 31 - 1:
+            return None
+        last_id = int(last_id)
+        id_op = '<' if order[-1][1].startswith('desc') else '>'
+        if len(order) == 1:
+            return [('id', id_op, last_id)]
+
+        field, direction = order[0]
+        op = '<' if direction.startswith('desc') else '>'
+        try:
+            value = Model._fields[field].convert_to_cache(value, Model) if value else value
+        except (ValueError, TypeError):
+            return None
+        if not value:
+            # NULL keys are sorted last: only the NULL rows with a smaller/greater id remain
+            return [(field, '=', False), ('id', id_op, last_id)]
+        return ['|', '|', (field, op, value), (field, '=', False),
+                '&', (field, '=', value), ('id', id_op, last_id)]
+
+    def _keyset_search(self, Model, domain, order, url, url_args, page, step, after=None):
+        """ Read one portal page with a keyset cursor instead of OFFSET, and build its pager.
+
+        ``order`` is a list of (field, direction) ending with ``id``; nullable keys must be sorted
+        ``nulls last``. The "next" link carries the sort key of the page's last row, so sequential
+        browsing seeks straight to it through the index however deep the page is. A direct jump
+        to a page number has no cursor and falls back to OFFSET, as does a malformed cursor. Rows
+        are counted exactly up to ``certification.portal_count_limit`` (default 10000); past that
+        the pager only knows the pages seen so far.
+        """
+        count_limit = int(request.env['ir.config_parameter'].sudo().get_param(
+            'certification.portal_count_limit', 10000))
+        order_spec = ', '.join(f"{field} {direction}" for field, direction in order)
+        offset = (max(int(page), 1) - 1) * step
+
+        keyset_domain = self._keyset_domain(Model, order, after) if after else None
+        if keyset_domain is not None:
+            records = Model.search(domain + keyset_domain, order=order_spec, limit=step + 1)
+        else:
+            records = Model.search(domain, order=order_spec, offset=offset, limit=step + 1)
+        has_more = len(records) > step
+        records = records[:step]
+
+        total = Model.search_count(domain, limit=count_limit)
+        total = max(total, offset + len(records) + (1 if has_more else 0))
+        pager = portal_pager(url=url, url_args=url_args, total=total, page=page, step=step)
+
+        if has_more and records:
+            last = records[-1]
+            key = last[order[0][0]] if len(order) > 1 else ''
+            cursor = f"{key or ''}~{last.id}"
+            for link in [pager['page_next']] + [p for p in pager['pages'] if p['num'] == pager['page']['num'] + 1]:
+                link['url'] += ('&' if '?' in link['url'] else '?') + url_encode({'after': cursor})
+        return records, pager
+
     # 1. HOME PAGE COUNTERS
     def _prepare_home_portal_values(self, counters):
         values = super()._prepare_home_portal_values(counters)
@@ -113,11 +352,12 @@ class MachineCustomerPortal(CustomerPortal):
             'model': {'input': 'model', 'label': _('Model Number')},
         }
 
+        ranked = False
         if search and search_in:
             search = search.strip()
             if search_in == 'all':
-                domain += ['|', '|', ('name', 'ilike', search), ('serial_number', 'ilike', search),
-                           ('model_no', 'ilike', search)]
+                # One trigram-indexed column, results ranked by relevance (see inspection.search.mixin)
+                ranked = True
             elif search_in == 'name':
                 domain += [('name', 'ilike', search)]
             elif search_in == 'serial':
@@ -125,15 +365,16 @@ class MachineCustomerPortal(CustomerPortal):
             elif search_in == 'model':
                 domain += [('model_no', 'ilike', search)]
 
-        machine_count = Machine.search_count(domain)
-        pager = portal_pager(
-            url="/my/machines",
-            url_args={'sortby': sortby, 'search': search, 'search_in': search_in},
-            total=machine_count,
-            page=page,
-            step=10
-        )
-        machines = Machine.search(domain, offset=pager['offset'], limit=10)
+        url_args = {'sortby': sortby, 'search': search, 'search_in': search_in}
+        if ranked:
+            machine_count = Machine.search_count(
+                domain + [('search_text', 'ilike', Machine._normalize_search_text(search))])
+            pager = portal_pager(url="/my/machines", url_args=url_args, total=machine_count, page=page, step=10)
+            machines = Machine._portal_search(domain, search, offset=pager['offset'], limit=10)
+        else:
+            # Report counts are a stored column: read with the rows, no per-machine query in the template
+            machines, pager = self._keyset_search(Machine, domain, [('id', 'asc')], "/my/machines", url_args,
+                                                  page, 10, after=kw.get('after'))
 
         values.update({
             'machines': machines,
@@ -155,13 +396,22 @@ class MachineCustomerPortal(CustomerPortal):
 
         logs = request.env['ir.attachment'].sudo().search([
             ('res_model', '=', 'inspection.machine'),
-            ('res_id', '=', machine.id)
+            ('res_id', '=', machine.id),
+            ('is_maintenance_log', '=', True),
         ])
 
+        # Latest inspections only, fetched in one query with the columns the history table shows
+        history_limit = 50
+        inspections = request.env['inspection.inspection'].search_fetch(
+            [('machine_id', '=', machine.id)], ['name', 'start_date', 'status'],
+            order='start_date desc, id desc', limit=history_limit)
+
         return request.render("certification.portal_my_machine_detail", {
             'machine': machine,
             'page_name': 'machine',
             'logs': logs,
+            'inspections': inspections,
+            'has_more_inspections': machine.inspection_count > history_limit,
         })
 
     # 4. REQUEST INSPECTION
@@ -182,6 +432,7 @@ class MachineCustomerPortal(CustomerPortal):
             'name': 'REQ: ' + machine.name,
             'company_id': request.env.company.id,
         })
+        new_inspection._instantiate_checklists()
 
         if customer_note:
             new_inspection.message_post(
@@ -205,17 +456,41 @@ class MachineCustomerPortal(CustomerPortal):
 
         file = kwargs.get('attachment')
         if file:
+            # Werkzeug already spooled the upload to a temp file: check its size on disk before
+            # loading anything, then hand the raw bytes to the filestore (no base64 copies).
+            max_mb = int(request.env['ir.config_parameter'].sudo().get_param(
+                'certification.portal_upload_max_size', 100))
+            file.stream.seek(0, 2)
+            size = file.stream.tell()
+            file.stream.seek(0)
+            if size > max_mb * 1024 * 1024:
+                return request.redirect(f'/my/machines/{machine_id}?error=log_too_large')
+
             request.env['ir.attachment'].sudo().create({
                 'name': file.filename,
                 'type': 'binary',
-                'datas': base64.b64encode(file.read()),
+                'raw': file.read(),
                 'res_model': 'inspection.machine',
                 'res_id': machine.id,
-                'mimetype': file.content_type
+                'mimetype': file.content_type,
+                'is_maintenance_log': True,
             })
 
         return request.redirect(f'/my/machines/{machine_id}?msg=log_uploaded')
 
+    # 5b. DOWNLOAD LOG
+    @http.route('/my/machines/<int:machine_id>/logs/<int:attachment_id>', type='http', auth="user", website=True)
+    def download_maintenance_log(self, machine_id, attachment_id, **kwargs):
+        machine = request.env['inspection.machine'].browse(machine_id)
+        if machine.partner_id != request.env.user.partner_id:
+            return request.not_found()
+
+        log = request.env['ir.attachment'].sudo().browse(attachment_id)
+        if not log.exists() or log.res_model != 'inspection.machine' or log.res_id != machine.id \
+                or not log.is_maintenance_log:
+            return request.not_found()
+        return request.env['ir.binary']._get_stream_from(log).get_response(as_attachment=True)
+
     # 6. MY INSPECTIONS LIST (UPDATED WITH SEARCH)
     @http.route(['/my/inspections', '/my/inspections/page/<int:page>'], type='http', auth="user", website=True)
     def portal_my_inspections(self, page=1, sortby=None, search=None, search_in='all', **kw):
@@ -225,8 +500,8 @@ class MachineCustomerPortal(CustomerPortal):
         domain = [('customer_id', '=', partner.id)]
 
         searchbar_sortings = {
-            'date': {'label': 'Newest', 'order': 'start_date desc'},
-            'status': {'label': 'Status', 'order': 'status'},
+            'date': {'label': 'Newest', 'order': 'start_date desc', 'keyset': [('start_date', 'desc'), ('id', 'desc')]},
+            'status': {'label': 'Status', 'order': 'status', 'keyset': [('status', 'asc'), ('id', 'desc')]},
         }
 
         # --- A. SEARCH INPUTS DEFINITION ---
@@ -239,14 +514,14 @@ class MachineCustomerPortal(CustomerPortal):
         }
 
         # --- B. APPLY SEARCH LOGIC ---
+        ranked = False
         if search and search_in:
             search = search.strip()
             if search_in == 'all':
-                domain += ['|', '|', '|',
-                           ('name', 'ilike', search),
-                           ('machine_id.name', 'ilike', search),
-                           ('machine_id.serial_number', 'ilike', search),
-                           ('status', 'ilike', search)]
+                # One trigram-indexed column; ranked by relevance unless a sort order was chosen
+                ranked = not sortby
+                if not ranked:
+                    domain += [('search_text', 'ilike', Inspection._normalize_search_text(search))]
             elif search_in == 'ref':
                 domain += [('name', 'ilike', search)]
             elif search_in == 'machine':
@@ -256,18 +531,17 @@ class MachineCustomerPortal(CustomerPortal):
             elif search_in == 'status':
                 domain += [('status', 'ilike', search)]
 
+        url_args = {'sortby': sortby, 'search': search, 'search_in': search_in}
         if not sortby: sortby = 'date'
-        order = searchbar_sortings[sortby]['order']
-
-        count = Inspection.search_count(domain)
-        pager = portal_pager(
-            url="/my/inspections",
-            url_args={'sortby': sortby, 'search': search, 'search_in': search_in},
-            total=count,
-            page=page,
-            step=15
-        )
-        inspections = Inspection.search(domain, order=order, limit=15, offset=pager['offset'])
+
+        if ranked:
+            count = Inspection.search_count(
+                domain + [('search_text', 'ilike', Inspection._normalize_search_text(search))])
+            pager = portal_pager(url="/my/inspections", url_args=url_args, total=count, page=page, step=15)
+            inspections = Inspection._portal_search(domain, search, offset=pager['offset'], limit=15)
+        else:
+            inspections, pager = self._keyset_search(Inspection, domain, searchbar_sortings[sortby]['keyset'],
+                                                     "/my/inspections", url_args, page, 15, after=kw.get('after'))
 
         values.update({
             'inspections': inspections,
@@ -278,7 +552,9 @@ class MachineCustomerPortal(CustomerPortal):
             'searchbar_inputs': searchbar_inputs,
             'sortby': sortby,
             'search': search,
-            'search_in': search_in
+            'search_in': search_in,
+            'export_years': list(range(datetime.now().year, datetime.now().year - 5, -1)),
+            'error': kw.get('error'),
         })
         return request.render("certification.portal_my_inspections", values)
 
@@ -287,9 +563,9 @@ class MachineCustomerPortal(CustomerPortal):
     def portal_my_documents(self, page=1, sortby=None, **kw):
         values = self._prepare_portal_layout_values()
         partner = request.env.user.partner_id
-        documents = partner.inspection_document_ids
-        pager = portal_pager(url="/my/documents", total=len(documents), page=page, step=15)
-        docs_paged = documents[pager['offset']:pager['offset'] + 15]
+        docs_paged, pager = self._keyset_search(
+            request.env['inspection.document'], [('partner_id', '=', partner.id)],
+            [('upload_date', 'desc nulls last'), ('id', 'desc')], "/my/documents", {}, page, 15, after=kw.get('after'))
 
         values.update({
             'documents': docs_paged,
@@ -305,10 +581,45 @@ class MachineCustomerPortal(CustomerPortal):
         document = request.env['inspection.document'].sudo().browse(doc_id)
         if document.partner_id != request.env.user.partner_id:
             return request.not_found()
-        return request.make_response(
-            base64.b64decode(document.file),
-            headers=[
-                ('Content-Type', 'application/octet-stream'),
-                ('Content-Disposition', f'attachment; filename={document.file_name}')
-            ]
-        )
+        # Served straight from the filestore (X-Sendfile when enabled), with Content-Length,
+        # ETag and Range support, instead of decoding the whole file in the worker.
+        stream = request.env['ir.binary']._get_stream_from(
+            document, 'file', filename=document.file_name, default_mimetype='application/octet-stream')
+        return stream.get_response(as_attachment=True)
+
+    # 9. BULK CERTIFICATE EXPORT
+    @http.route('/my/certificates/export', type='http', auth="user", methods=['POST'], website=True)
+    def portal_certificate_export(self, year=None, machine_id=None, **kw):
+        partner = request.env.user.partner_id
+        vals = {
+            'name': f"Certificates - {partner.name}" + (f" - {year}" if year else ""),
+            'user_id': request.env.user.id,
+            'partner_id': partner.id,
+        }
+        if year and str(year).isdigit():
+            vals.update({'date_from': f"{year}-01-01", 'date_to': f"{year}-12-31"})
+        if machine_id and str(machine_id).isdigit():
+            machine = request.env['inspection.machine'].sudo().browse(int(machine_id))
+            if machine.partner_id == partner:
+                vals['machine_id'] = machine.id
+
+        export = request.env['inspection.certificate.export'].sudo().create(vals)
+        try:
+            export.action_prepare()
+        except ValidationError:
+            return request.redirect('/my/inspections?error=no_certificates')
+        return request.redirect(f'/my/certificates/export/{export.id}')
+
+    @http.route('/my/certificates/export/<int:export_id>', type='http', auth="user", website=True)
+    def portal_certificate_export_status(self, export_id, **kw):
+        export = request.env['inspection.certificate.export'].sudo().browse(export_id)
+        if not export.exists() or export.user_id != request.env.user:
+            return request.not_found()
+        export.action_refresh()
+
+        values = self._prepare_portal_layout_values()
+        values.update({
+            'export': export,
+            'page_name': 'inspection',
+        })
+        return request.render("certification.portal_certificate_export", values)
@@ -0,0 +1,109 @@
+"""Signed certificate QR payloads.
+
+A payload is ``CERT1.<claims>.<signature>``: base64url JSON claims (certificate reference,
+machine serial, status, expiry) signed with Ed25519. The QR code carries it in the ``p``
+parameter of the /inspection/verify URL, so a phone still opens the online check, while an
+auditor without connectivity verifies the scan with only this file, the ``cryptography``
+package and the public key published at /inspection/verify/public_key::
+
+    python certificate_qr.py --key <public key> "<scanned URL or payload>"
+
+This module deliberately has no Odoo import.
+"""
+import argparse
+import base64
+import json
+import sys
+from datetime import date
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+    from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+except ImportError:
+    Ed25519PrivateKey = Ed25519PublicKey = None
+
+PREFIX = 'CERT1'
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def generate_private_key():
+    """ New signing key, as base64url raw bytes """
+    key = Ed25519PrivateKey.generate()
+    return _b64encode(key.private_bytes(Encoding.Raw, PrivateFormat.Raw, NoEncryption()))
+
+
+def get_public_key(private_key):
+    key = Ed25519PrivateKey.from_private_bytes(_b64decode(private_key))
+    return _b64encode(key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw))
+
+
+def sign_payload(claims, private_key):
+    key = Ed25519PrivateKey.from_private_bytes(_b64decode(private_key))
+    body = _b64encode(json.dumps(claims, separators=(',', ':'), sort_keys=True).encode())
+    signature = key.sign(f"{PREFIX}.{body}".encode())
+    return f"{PREFIX}.{body}.{_b64encode(signature)}"
+
+
+def extract_payload(text):
+    """ Accept the full scanned URL as well as the bare payload """
+    text = text.strip()
+    if '://' in text:
+        return parse_qs(urlparse(text).query).get('p', [''])[0]
+    return text
+
+
+def verify_payload(text, public_key):
+    """ Return the claims of a genuine payload, raise ValueError otherwise """
+    prefix, _sep, rest = extract_payload(text).partition('.')
+    body, _sep, signature = rest.partition('.')
+    if prefix != PREFIX or not body or not signature:
+        raise ValueError("Not a certificate payload.")
+    key = Ed25519PublicKey.from_public_bytes(_b64decode(public_key))
+    try:
+        key.verify(_b64decode(signature), f"{PREFIX}.{body}".encode())
+    except (InvalidSignature, ValueError):
+        raise ValueError("Invalid signature: this certificate was not issued with this key.")
+    return json.loads(_b64decode(body))
+
+
+def is_expired(claims, today=None):
+    return bool(claims.get('e')) and date.fromisoformat(claims['e']) < (today or date.today())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify a certificate QR payload offline.")
+    parser.add_argument('--key', required=True, help="Public key from /inspection/verify/public_key")
+    parser.add_argument('payload', help="Scanned URL or payload")
+    args = parser.parse_args(argv)
+
+    if Ed25519PublicKey is None:
+        print("The 'cryptography' package is required.", file=sys.stderr)
+        return 3
+    try:
+        claims = verify_payload(args.payload, args.key)
+    except ValueError as e:
+        print(f"INVALID: {e}")
+        return 1
+
+    print(f"Certificate: {claims.get('r')}")
+    print(f"Serial:      {claims.get('s') or 'N/A'}")
+    print(f"Status:      {claims.get('st')}")
+    print(f"Expires:     {claims.get('e') or 'N/A'}")
+    if is_expired(claims):
+        print("EXPIRED: genuine certificate, past its expiry date")
+        return 2
+    print("VALID")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
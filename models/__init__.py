@@ -1,4 +1,11 @@
+from . import inspection_search_mixin
 from . import inspection_category
 from . import inspection_machine
 from . import inspection_inspection
 from . import res_partner
+from . import res_users
+from . import ir_attachment
+from . import inspection_certificate_job
+from . import inspection_photo_upload
+from . import report_certificate
+from . import inspection_certificate_export
@@ -1,4 +1,6 @@
 from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import hashlib
 
 
 class InspectionCategory(models.Model):
@@ -20,14 +22,20 @@ class InspectionCategory(models.Model):
     #  Link to machines for Smart Button
     machine_ids = fields.One2many('inspection.machine', 'category_id', string="Machines")
 
-    inspection_count = fields.Integer(string="Inspection Count", compute='_compute_counts')
-    machine_count = fields.Integer(string="Machine Count", compute='_compute_counts')
+    inspection_count = fields.Integer(string="Inspection Count", compute='_compute_counts', store=True)
+    machine_count = fields.Integer(string="Machine Count", compute='_compute_counts', store=True)
 
     @api.depends('inspection_ids', 'machine_ids')
     def _compute_counts(self):
+        inspection_groups = self.env['inspection.inspection'].read_group(
+            [('category_id', 'in', self.ids)], ['category_id'], ['category_id'])
+        machine_groups = self.env['inspection.machine'].read_group(
+            [('category_id', 'in', self.ids)], ['category_id'], ['category_id'])
+        inspection_counts = {g['category_id'][0]: g['category_id_count'] for g in inspection_groups}
+        machine_counts = {g['category_id'][0]: g['category_id_count'] for g in machine_groups}
         for record in self:
-            record.inspection_count = len(record.inspection_ids)
-            record.machine_count = len(record.machine_ids)
+            record.inspection_count = inspection_counts.get(record._origin.id, 0)
+            record.machine_count = machine_counts.get(record._origin.id, 0)
 
     def action_view_inspections(self):
         self.ensure_one()
@@ -107,8 +115,8 @@ class InspectionQuestion(models.Model):
     _description = 'Inspection Question Template'
     _order = 'sequence, id'
 
-    category_id = fields.Many2one('inspection.category', string="Category")
-    machine_id = fields.Many2one('inspection.machine', string="Machine")
+    category_id = fields.Many2one('inspection.category', string="Category", index=True)
+    machine_id = fields.Many2one('inspection.machine', string="Machine", index=True)
 
     section = fields.Char(string="Section")
     serial_no = fields.Char(string="No")
@@ -120,20 +128,87 @@ class InspectionQuestion(models.Model):
     is_rejected = fields.Boolean(string="R")
     is_na = fields.Boolean(string="N/A")
 
-    @api.onchange('is_accepted')
-    def _onchange_accepted(self):
-        if self.is_accepted:
-            self.is_rejected = False
-            self.is_na = False
-
-    @api.onchange('is_rejected')
-    def _onchange_rejected(self):
-        if self.is_rejected:
-            self.is_accepted = False
-            self.is_na = False
-
-    @api.onchange('is_na')
-    def _onchange_na(self):
-        if self.is_na:
-            self.is_accepted = False
-            self.is_rejected = False
+    # Edited with the client-side checklist_result widget (exclusive A / R / N/A, no onchange)
+    default_result = fields.Selection([
+        ('accepted', 'Accepted'),
+        ('rejected', 'Rejected'),
+        ('na', 'N/A')
+    ], string="Default Result", compute='_compute_default_result', inverse='_inverse_default_result')
+
+    @api.depends('is_accepted', 'is_rejected', 'is_na')
+    def _compute_default_result(self):
+        for question in self:
+            if question.is_accepted:
+                question.default_result = 'accepted'
+            elif question.is_rejected:
+                question.default_result = 'rejected'
+            elif question.is_na:
+                question.default_result = 'na'
+            else:
+                question.default_result = False
+
+    def _inverse_default_result(self):
+        for question in self:
+            question.write({
+                'is_accepted': question.default_result == 'accepted',
+                'is_rejected': question.default_result == 'rejected',
+                'is_na': question.default_result == 'na',
+            })
+
+
+class InspectionQuestionSnapshot(models.Model):
+    """ Immutable copy of a question's text, shared by every checklist line asking it.
+
+    Snapshots are content-addressed: editing a template question produces a new snapshot
+    (a new version) on the next inspections, while past inspections keep the wording they
+    were performed with.
+    """
+    _name = 'inspection.question.snapshot'
+    _description = 'Checklist Question Snapshot'
+
+    section = fields.Char(string="Section", readonly=True)
+    serial_no = fields.Char(string="No", readonly=True)
+    name = fields.Char(string="Examination Item", required=True, readonly=True)
+    checksum = fields.Char(string="Checksum", required=True, readonly=True)
+
+    _sql_constraints = [
+        ('checksum_uniq', 'unique(checksum)', "A snapshot of this question already exists."),
+    ]
+
+    @api.model
+    def _get_checksum(self, section, serial_no, name):
+        # Same digest as the SQL migration in inspection.inspection.line init()
+        key = '\x1f'.join([section or '', serial_no or '', name or ''])
+        return hashlib.md5(key.encode()).hexdigest()
+
+    @api.model
+    def _get_snapshots(self, questions):
+        """ Snapshot ids for (section, serial_no, name) tuples, created on the fly if missing """
+        by_checksum = {self._get_checksum(*q): q for q in questions}
+        if not by_checksum:
+            return {}
+        checksums = list(by_checksum)
+        # ON CONFLICT: concurrent inspections may snapshot the same new question
+        self.env.cr.execute("""
+            INSERT INTO inspection_question_snapshot
+                   (section, serial_no, name, checksum, create_uid, write_uid, create_date, write_date)
+            SELECT q.section, q.serial_no, q.name, q.checksum, %(uid)s, %(uid)s,
+                   NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(sections)s::varchar[], %(serials)s::varchar[], %(names)s::varchar[],
+                          %(checksums)s::varchar[]) AS q(section, serial_no, name, checksum)
+                ON CONFLICT (checksum) DO NOTHING
+        """, {
+            'uid': self.env.uid,
+            'sections': [by_checksum[c][0] or None for c in checksums],
+            'serials': [by_checksum[c][1] or None for c in checksums],
+            'names': [by_checksum[c][2] or '' for c in checksums],
+            'checksums': checksums,
+        })
+        self.env.cr.execute(
+            "SELECT checksum, id FROM inspection_question_snapshot WHERE checksum = ANY(%s)", [checksums])
+        ids = dict(self.env.cr.fetchall())
+        return {q: ids[self._get_checksum(*q)] for q in questions}
+
+    def write(self, vals):
+        raise ValidationError("Question snapshots cannot be modified, edit the template question instead.")
+
@@ -0,0 +1,134 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.tools.safe_eval import safe_eval
+import logging
+import tempfile
+import zipfile
+
+_logger = logging.getLogger(__name__)
+
+
+class InspectionCertificateExport(models.Model):
+    _name = 'inspection.certificate.export'
+    _description = 'Bulk Certificate Export'
+    _order = 'id desc'
+
+    name = fields.Char(string="Export", required=True, default="Certificates")
+    user_id = fields.Many2one('res.users', string="Requested By", default=lambda self: self.env.user,
+                              readonly=True, index=True)
+
+    # --- SELECTION (combined with AND, passed inspections only) ---
+    domain = fields.Char(string="Domain", default="[]", help="Extra domain over inspections.")
+    partner_id = fields.Many2one('res.partner', string="Customer")
+    machine_id = fields.Many2one('inspection.machine', string="Machine")
+    date_from = fields.Date(string="Inspected From")
+    date_to = fields.Date(string="Inspected To")
+
+    inspection_ids = fields.Many2many('inspection.inspection', string="Inspections", readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('rendering', 'Rendering'),
+        ('ready', 'Ready')
+    ], string="Status", default='draft', required=True)
+
+    total_count = fields.Integer(string="Certificates", compute='_compute_progress')
+    ready_count = fields.Integer(string="Rendered", compute='_compute_progress')
+    failed_count = fields.Integer(string="Failed", compute='_compute_progress')
+    progress = fields.Float(string="Progress", compute='_compute_progress')
+
+    def _get_inspection_domain(self):
+        self.ensure_one()
+        domain = [('status', '=', 'passed')] + safe_eval(self.domain or '[]')
+        if self.partner_id:
+            domain.append(('customer_id', '=', self.partner_id.id))
+        if self.machine_id:
+            domain.append(('machine_id', '=', self.machine_id.id))
+        if self.date_from:
+            domain.append(('start_date', '>=', self.date_from))
+        if self.date_to:
+            domain.append(('start_date', '<=', self.date_to))
+        return domain
+
+    def _get_certificates(self):
+        """ Latest generated certificate attachment per inspection: {inspection_id: attachment} """
+        self.ensure_one()
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', 'inspection.inspection'),
+            ('res_id', 'in', self.inspection_ids.ids),
+            ('name', '=like', 'Certificate - %.pdf'),
+        ], order='id desc')
+        certificates = {}
+        for attachment in attachments:
+            certificates.setdefault(attachment.res_id, attachment)
+        return certificates
+
+    @api.depends('inspection_ids')
+    def _compute_progress(self):
+        for export in self:
+            certificates = export._get_certificates() if export.inspection_ids else {}
+            missing = export.inspection_ids.filtered(lambda i: i.id not in certificates)
+            failed = self.env['inspection.certificate.job'].sudo().search_count([
+                ('inspection_id', 'in', missing.ids), ('state', '=', 'failed')])
+            export.total_count = len(export.inspection_ids)
+            export.ready_count = len(certificates)
+            export.failed_count = failed
+            export.progress = 100.0 * len(certificates) / len(export.inspection_ids) if export.inspection_ids else 0.0
+
+    # -------------------------------------------------------------------------
+    # ACTIONS
+    # -------------------------------------------------------------------------
+    def action_prepare(self):
+        """ Select the inspections and queue rendering of the certificates not generated yet """
+        for export in self:
+            inspections = self.env['inspection.inspection'].search(export._get_inspection_domain())
+            if not inspections:
+                raise ValidationError("No passed inspection matches this export.")
+            export.inspection_ids = inspections
+
+            certificates = export._get_certificates()
+            missing = inspections.filtered(lambda i: i.id not in certificates)
+            # Rendered in batches by the certificate queue (several workers can drain it in parallel)
+            self.env['inspection.certificate.job'].sudo()._enqueue(missing)
+            export.state = 'rendering' if missing else 'ready'
+        return True
+
+    def action_refresh(self):
+        for export in self.filtered(lambda e: e.state == 'rendering'):
+            if export.ready_count + export.failed_count >= export.total_count:
+                export.state = 'ready'
+        return True
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/certification/export/{self.id}/download',
+            'target': 'self',
+        }
+
+    # -------------------------------------------------------------------------
+    # ZIP
+    # -------------------------------------------------------------------------
+    def _build_zip(self):
+        """ Write the available certificates into a temporary file and return it rewound.
+
+        Filestore attachments are copied into the archive from disk, chunk by chunk, so
+        neither the PDFs nor the ZIP are ever held in memory as a whole.
+        """
+        self.ensure_one()
+        Attachment = self.env['ir.attachment'].sudo()
+        tmp = tempfile.TemporaryFile()
+        names = set()
+        with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for attachment in self._get_certificates().values():
+                arcname = attachment.name.replace('/', '_')
+                if arcname in names:
+                    arcname = f"{arcname[:-4]} ({attachment.res_id}).pdf"
+                names.add(arcname)
+                if attachment.store_fname:
+                    archive.write(Attachment._full_path(attachment.store_fname), arcname)
+                else:
+                    archive.writestr(arcname, attachment.raw or b'')
+        tmp.seek(0)
+        _logger.info(f"Certificate export {self.id}: {len(names)} PDFs zipped")
+        return tmp
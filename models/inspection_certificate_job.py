@@ -0,0 +1,147 @@
+from odoo import models, fields, api
+import base64
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class InspectionCertificateJob(models.Model):
+    _name = 'inspection.certificate.job'
+    _description = 'Certificate Render Job'
+    _order = 'id desc'
+
+    inspection_id = fields.Many2one('inspection.inspection', string="Inspection", required=True,
+                                    ondelete='cascade', index=True)
+    name = fields.Char(related='inspection_id.name', string="Reference")
+
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], string="Status", default='queued', required=True, index=True)
+
+    batch_size = fields.Integer(string="Batch Size", readonly=True,
+                                help="Number of certificates rendered in the same wkhtmltopdf run.")
+    date_started = fields.Datetime(string="Started On", readonly=True)
+    date_done = fields.Datetime(string="Finished On", readonly=True)
+    duration = fields.Float(string="Render Time (s)", readonly=True, digits=(16, 2))
+    attachment_id = fields.Many2one('ir.attachment', string="Certificate", readonly=True, ondelete='set null')
+    error = fields.Text(string="Error", readonly=True)
+
+    # -------------------------------------------------------------------------
+    # QUEUE API
+    # -------------------------------------------------------------------------
+    @api.model
+    def _enqueue(self, inspections):
+        """ Queue certificate rendering for these inspections and wake up the worker """
+        pending = self.search([('inspection_id', 'in', inspections.ids), ('state', 'in', ['queued', 'running'])])
+        to_queue = inspections - pending.inspection_id
+        jobs = self.create([{'inspection_id': insp.id} for insp in to_queue])
+        cron = self.env.ref('certification.ir_cron_render_certificates', raise_if_not_found=False)
+        if cron and jobs:
+            cron._trigger()
+        return jobs
+
+    def action_retry(self):
+        self.write({'state': 'queued', 'error': False})
+        cron = self.env.ref('certification.ir_cron_render_certificates', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    # -------------------------------------------------------------------------
+    # WORKER
+    # -------------------------------------------------------------------------
+    @api.model
+    def _cron_process_queue(self):
+        """ Drain the queue in batches of N inspections, one wkhtmltopdf run per batch.
+
+        Batches are claimed with SKIP LOCKED, so several copies of the cron (or manual runs)
+        can work the queue in parallel without rendering the same certificate twice.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        batch_size = int(ICP.get_param('certification.certificate_batch_size', 20))
+        max_batches = int(ICP.get_param('certification.certificate_batches_per_run', 10))
+
+        for _i in range(max_batches):
+            jobs = self._claim_batch(batch_size)
+            if not jobs:
+                break
+            jobs._render_batch()
+            self.env.cr.commit()
+
+        if self.search_count([('state', '=', 'queued')], limit=1):
+            self.env.ref('certification.ir_cron_render_certificates')._trigger()
+
+    @api.model
+    def _claim_batch(self, batch_size):
+        self.flush_model(['state'])
+        self.env.cr.execute("""
+            SELECT id FROM inspection_certificate_job
+             WHERE state = 'queued'
+          ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [batch_size])
+        jobs = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if jobs:
+            jobs.write({'state': 'running', 'date_started': fields.Datetime.now(), 'batch_size': len(jobs)})
+        return jobs
+
+    def _render_batch(self):
+        """ Render the batch in one wkhtmltopdf run, falling back to one run per inspection.
+
+        Every job is stored in its own savepoint: a record that cannot be rendered only fails
+        its own job, instead of rolling the batch back into the queue where it would be
+        claimed first again on every run.
+        """
+        report = self.env.ref('certification.action_report_certificate')
+        started = time.time()
+        try:
+            with self.env.cr.savepoint():
+                streams = report._render_qweb_pdf_prepare_streams(report.report_name, {},
+                                                                  res_ids=self.inspection_id.ids)
+        except Exception as e:
+            _logger.warning(f"Certificate batch of {len(self)} failed, rendering one by one: {e}")
+            streams = {}
+        # wkhtmltopdf could not split the merged PDF: fall back to one run per inspection
+        if False in streams:
+            streams = {}
+        batch_elapsed = (time.time() - started) / len(self)
+
+        for job in self:
+            job_started = time.time()
+            try:
+                with self.env.cr.savepoint():
+                    stream = streams.get(job.inspection_id.id, {}).get('stream')
+                    job._store_certificate(report, stream)
+            except Exception as e:
+                _logger.error(f"Certificate of {job.inspection_id.name} failed: {e}")
+                job.write({'state': 'failed', 'error': str(e), 'date_done': fields.Datetime.now()})
+                continue
+            job.duration = batch_elapsed if stream is not None else time.time() - job_started
+        _logger.info(f"Rendered {len(self)} certificates in {time.time() - started:.2f}s")
+
+    def _store_certificate(self, report, stream=None):
+        """ Attach the certificate PDF (rendered alone when the batch produced none) and close the job """
+        self.ensure_one()
+        insp = self.inspection_id
+        if stream is None:
+            pdf_content, _ = report._render_qweb_pdf(report.report_name, insp.ids)
+        else:
+            pdf_content = stream if isinstance(stream, bytes) else stream.getvalue()
+        attachment = self.env['ir.attachment'].create({
+            'name': f"Certificate - {insp.name}.pdf",
+            'type': 'binary',
+            'datas': base64.b64encode(pdf_content),
+            'res_model': 'inspection.inspection',
+            'res_id': insp.id,
+            'mimetype': 'application/pdf'
+        })
+        self.write({
+            'state': 'done',
+            'attachment_id': attachment.id,
+            'date_done': fields.Datetime.now(),
+            'error': False,
+        })
@@ -1,7 +1,10 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools.sql import column_exists, create_index
 from dateutil.relativedelta import relativedelta
 import base64
+import hashlib
 from io import BytesIO
 import logging
 
@@ -12,10 +15,12 @@ try:
 except ImportError:
     qrcode = None
 
+from ..lib import certificate_qr
+
 
 class InspectionInspection(models.Model):
     _name = 'inspection.inspection'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'inspection.search.mixin']
     _description = 'Inspection Sheet'
     _order = 'start_date desc, id desc'
 
@@ -42,7 +47,11 @@ class InspectionInspection(models.Model):
 
     # Inspector Signature (Internal)
     inspector_name = fields.Char(string="Inspector Name")
-    inspector_signature = fields.Binary(string="Inspector Signature")
+    # A signed sheet references the signature it was signed with: an immutable attachment owned by
+    # the inspector and shared by every sheet they signed with the same drawing, never a copy
+    inspector_signature = fields.Binary(string="Inspector Signature", compute='_compute_inspector_signature',
+                                        inverse='_inverse_inspector_signature')
+    inspector_signature_id = fields.Many2one('ir.attachment', string="Signature Used", readonly=True, copy=False)
 
     # Customer Signature (External)
     customer_signature = fields.Binary(string="Customer Signature", attachment=True)
@@ -77,6 +86,147 @@ class InspectionInspection(models.Model):
     # Assigned Inspector
     inspector_id = fields.Many2one('res.users', string="Assigned Inspector", default=lambda self: self.env.user)
 
+    # Normalized reference / status / machine name, serial and model, trigram-indexed for the portal search
+    search_text = fields.Char(compute='_compute_search_text', store=True)
+
+    # Expiration reminder ledger: the stage makes the reminder cron idempotent and catch up after
+    # missed runs, the date is the audit trail shown on the form
+    reminder_sent_date = fields.Date(string="Last Expiry Reminder", readonly=True, copy=False)
+    reminder_stage = fields.Integer(string="Reminder Stage", readonly=True, copy=False, default=0,
+                                    help="Smallest 'days before expiry' offset already reminded (0 = none yet).")
+
+    def init(self):
+        self._migrate_inspector_signatures()
+        # Range scan used by the reminder cron: passed certificates by expiry, filtered on stage
+        create_index(self.env.cr, 'inspection_inspection_reminder_idx', self._table,
+                     ['status', 'expire_date', 'reminder_stage'])
+        # Expiring list on the main dashboard: passed certificates only, by expiry
+        create_index(self.env.cr, 'inspection_inspection_passed_expire_idx', self._table,
+                     ['expire_date'], where="status = 'passed'")
+        # Machine compliance snapshot: furthest passed expiry per machine
+        create_index(self.env.cr, 'inspection_inspection_machine_passed_idx', self._table,
+                     ['machine_id', 'expire_date DESC NULLS LAST', 'id DESC'], where="status = 'passed'")
+        # Last inspection lookup (onchange, public machine page): machine + status, newest first
+        create_index(self.env.cr, 'inspection_inspection_machine_status_date_idx', self._table,
+                     ['machine_id', 'status', 'start_date DESC'])
+        # Inspector tracking: grouped counts and next draft task by start date
+        create_index(self.env.cr, 'inspection_inspection_inspector_status_idx', self._table,
+                     ['inspector_id', 'status', 'start_date'])
+        # Portal lists and risk watchlist: per customer, in the model's default order
+        create_index(self.env.cr, 'inspection_inspection_customer_date_idx', self._table,
+                     ['customer_id', 'start_date DESC', 'id DESC'])
+        # Portal search, see inspection.search.mixin
+        self._init_search_index()
+        # Backfill the machine compliance snapshot on install / upgrade. Done here rather than in
+        # inspection.machine.init(), which runs before the inspection_inspection table exists.
+        self.env['inspection.machine']._update_compliance_snapshot()
+        # Signing key of the QR payloads, created once here rather than by concurrent requests
+        self._init_qr_signing_key()
+        # Dashboard change counter, see _bump_dashboard_version()
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS inspection_dashboard_version_seq")
+
+    @api.depends('name', 'status', 'machine_id.name', 'machine_id.serial_number', 'machine_id.model_no')
+    def _compute_search_text(self):
+        for rec in self:
+            rec.search_text = self._build_search_text(
+                rec.name, rec.status, rec.machine_id.name, rec.machine_id.serial_number, rec.machine_id.model_no)
+
+    @api.depends('inspector_signature_id')
+    def _compute_inspector_signature(self):
+        for rec in self:
+            rec.inspector_signature = rec.inspector_signature_id.sudo().datas
+
+    def _inverse_inspector_signature(self):
+        for rec in self:
+            signature = rec.inspector_signature
+            inspector = rec.inspector_id
+            # First signature of an inspector signing their own sheet becomes their reusable one
+            if signature and inspector == self.env.user and not inspector.inspector_signature:
+                inspector.sudo().inspector_signature = signature
+            rec.inspector_signature_id = rec._get_signature_attachment(signature) if signature else False
+
+    def _get_signature_attachment(self, signature):
+        """ Attachment holding ``signature`` (base64), owned by the inspector (or the sheet).
+
+        These attachments are never rewritten: editing the reusable res.users signature leaves
+        the sheets signed earlier with the drawing they were signed with.
+        """
+        self.ensure_one()
+        raw = base64.b64decode(signature)
+        owner = self.inspector_id or self
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment = Attachment.search([
+            ('res_model', '=', owner._name),
+            ('res_id', '=', owner.id),
+            ('name', '=', 'Inspector Signature'),
+            ('checksum', '=', hashlib.sha1(raw).hexdigest()),
+        ], limit=1)
+        return attachment or Attachment.create({
+            'name': 'Inspector Signature',
+            'res_model': owner._name,
+            'res_id': owner.id,
+            'raw': raw,
+            'mimetype': 'image/png',
+        })
+
+    def action_apply_inspector_signature(self):
+        """ Sign the sheets with the current user's reusable signature """
+        signature = self.env.user.inspector_signature
+        if not signature:
+            raise ValidationError("Set your signature in your preferences first.")
+        for rec in self:
+            rec.inspector_signature = signature
+        return True
+
+    def _migrate_inspector_signatures(self):
+        """ Move signatures from the former inline column to filestore attachments.
+
+        The signature an inspector used most becomes their reusable res.users signature. Every
+        sheet that was signed (only those: NULL means never signed) references an attachment per
+        distinct inspector and drawing. The filestore is content-addressed, so identical blobs
+        are stored once on disk.
+        """
+        cr = self.env.cr
+        if not column_exists(cr, self._table, 'inspector_signature'):
+            return
+
+        # 1. Most frequent signature per inspector becomes their reusable one
+        cr.execute("""
+            SELECT DISTINCT ON (inspector_id) inspector_id, min(id)
+              FROM inspection_inspection
+             WHERE inspector_signature IS NOT NULL AND inspector_id IS NOT NULL
+          GROUP BY inspector_id, md5(inspector_signature)
+          ORDER BY inspector_id, COUNT(*) DESC
+        """)
+        for user_id, insp_id in cr.fetchall():
+            cr.execute("SELECT inspector_signature FROM inspection_inspection WHERE id = %s", [insp_id])
+            self.env['res.users'].sudo().browse(user_id).inspector_signature = bytes(cr.fetchone()[0])
+
+        # 2. Signed sheets reference one attachment per inspector and drawing (per sheet without inspector)
+        cr.execute("""
+            SELECT inspector_id, array_agg(id ORDER BY id)
+              FROM inspection_inspection
+             WHERE inspector_signature IS NOT NULL
+          GROUP BY inspector_id, md5(inspector_signature), CASE WHEN inspector_id IS NULL THEN id END
+        """)
+        groups = cr.fetchall()
+        Attachment = self.env['ir.attachment'].sudo()
+        for inspector_id, insp_ids in groups:
+            cr.execute("SELECT inspector_signature FROM inspection_inspection WHERE id = %s", [insp_ids[0]])
+            attachment = Attachment.create({
+                'name': 'Inspector Signature',
+                'res_model': 'res.users' if inspector_id else self._name,
+                'res_id': inspector_id or insp_ids[0],
+                'datas': bytes(cr.fetchone()[0]),
+                'mimetype': 'image/png',
+            })
+            cr.execute("UPDATE inspection_inspection SET inspector_signature_id = %s WHERE id = ANY(%s)",
+                       [attachment.id, insp_ids])
+
+        # 3. Drop the inline column (and its TOAST data)
+        cr.execute("ALTER TABLE inspection_inspection DROP COLUMN inspector_signature")
+        _logger.info(f"Inspector signatures: {len(groups)} distinct signatures referenced by the signed sheets")
+
     # -------------------------------------------------------------------------
     # CONSTRAINT: SMART GOOGLE VALIDATION (Accepts App Short Links)
     # -------------------------------------------------------------------------
@@ -197,33 +347,7 @@ class InspectionInspection(models.Model):
 
         # 6. INSPECTOR TRACKING (Added Section)
         # ---------------------------------------------------------
-        users = self.env['res.users'].sudo().search([('share', '=', False)])
-        inspector_data = []
-
-        for user in users:
-            # Count Completed (Using 'inspector_id' to match your field name)
-            done_count = self.search_count([
-                ('inspector_id', '=', user.id),
-                ('status', 'in', ['passed', 'failed'])
-            ])
-
-            # Find Next Task (Using 'start_date' to match your field name)
-            next_task = self.search([
-                ('inspector_id', '=', user.id),
-                ('status', 'in', ['draft', 'pending'])
-            ], order='start_date asc', limit=1)
-
-            # Check if user has any activity
-            has_activity = self.search_count([('inspector_id', '=', user.id)]) > 0
-
-            if has_activity:
-                inspector_data.append({
-                    'id': user.id,
-                    'name': user.name,
-                    'done_count': done_count,
-                    'next_date': next_task.start_date if next_task and next_task.start_date else False,
-                    'next_machine': next_task.machine_id.name if next_task and next_task.machine_id else False,
-                })
+        inspector_data = self._get_inspector_tracking_data()
         # ---------------------------------------------------------
 
         return {
@@ -245,86 +369,227 @@ class InspectionInspection(models.Model):
             'inspectors': inspector_data  # <--- Included in return
         }
 
+    # -------------------------------------------------------------------------
+    # DASHBOARD VERSIONING (cheap "what changed since my last fetch")
+    # -------------------------------------------------------------------------
     @api.model
-    def get_customer_dashboard_stats(self):
-        Machine = self.env['inspection.machine']
-        Inspection = self.env['inspection.inspection']
-        Partner = self.env['res.partner']
+    def _bump_dashboard_version(self):
+        """ Mark dashboard data as changed after an inspection or machine write.
+
+        A PostgreSQL sequence is used on purpose: nextval() takes no row lock, so concurrent
+        writers never serialize (or fail under REPEATABLE READ) on a shared counter row. It is
+        not transactional either, so it is only bumped once the write is committed: a reader
+        that sees the new version can then also see the new data (see _read_dashboard_data).
+        """
+        cr = self.env.cr
+        if cr.postcommit.data.get('certification.dashboard_bump'):
+            return
+        cr.postcommit.data['certification.dashboard_bump'] = True
+        registry = self.env.registry
 
-        # 1. Existing Logic for Charts & KPIs
-        machines_by_partner = Machine.read_group(
-            domain=[('partner_id', '!=', False)], fields=['partner_id'], groupby=['partner_id'],
-            orderby='partner_id_count desc'
-        )
-        market_share_labels = []
-        market_share_data = []
-        active_clients_count = len(machines_by_partner)
-        largest_fleet_holder = {'id': False, 'name': 'None', 'count': 0}
-
-        for index, group in enumerate(machines_by_partner):
-            partner_name = group['partner_id'][1]
-            partner_id = group['partner_id'][0]
-            count = group['partner_id_count']
-            if index < 5:
-                market_share_labels.append(partner_name)
-                market_share_data.append(count)
-            if index == 0:
-                largest_fleet_holder = {'id': partner_id, 'name': partner_name, 'count': count}
-
-        # 2. Risk Watchlist
-        failed_by_partner = Inspection.read_group(
-            domain=[('status', '=', 'failed'), ('customer_id', '!=', False)], fields=['customer_id'],
-            groupby=['customer_id'], orderby='customer_id_count desc', limit=5
-        )
-        risk_list = []
-        for group in failed_by_partner:
-            risk_list.append(
-                {'id': group['customer_id'][0], 'name': group['customer_id'][1], 'count': group['customer_id_count']})
-
-        # 3. UPDATED: Fetch MORE fields for the "Pro" Cards
-        all_customers = Partner.search_read(
-            domain=['|', ('machine_ids', '!=', False), ('customer_rank', '>', 0)],
-            fields=['id', 'name', 'street', 'city', 'email', 'phone', 'mobile', 'machine_count', 'inspection_count'],
-            order='name asc'
-        )
+        @cr.postcommit.add
+        def bump():
+            with registry.cursor() as bump_cr:
+                bump_cr.execute("SELECT nextval('inspection_dashboard_version_seq')")
 
-        # Add risk flag
-        risk_ids = [r['id'] for r in risk_list]
-        for cust in all_customers:
-            cust['is_risk'] = cust['id'] in risk_ids
+    @api.model
+    def _get_dashboard_version(self):
+        self.env.cr.execute("SELECT last_value FROM inspection_dashboard_version_seq")
+        return self.env.cr.fetchone()[0]
 
-        return {
-            'kpi': {'active_clients': active_clients_count, 'largest_fleet': largest_fleet_holder},
-            'charts': {'market_share': {'labels': market_share_labels, 'data': market_share_data}},
-            'lists': {'risk_watchlist': risk_list, 'all_customers': all_customers}
+    @api.model
+    def _read_dashboard_data(self, compute):
+        """ Return ``compute(env)`` evaluated in a transaction started after this call.
+
+        Call it after reading the version: the request's own snapshot may predate a commit whose
+        version bump is already visible, and data computed from it would be cached or served
+        under a version it does not reflect.
+        """
+        with self.env.registry.cursor() as cr:
+            return compute(self.env(cr=cr))
+
+    @api.model
+    def get_dashboard_payload(self, dashboard, version=None):
+        """ Versioned entry point for the OWL dashboards.
+
+        Returns ``{'version': v, 'not_modified': True}`` when nothing changed since the
+        client's ``version``, otherwise ``{'version': v, 'data': <stats>}``.
+        """
+        providers = {
+            'main': lambda env: env['inspection.inspection'].get_dashboard_stats(),
+            'machine': lambda env: env['inspection.machine'].get_machine_dashboard_stats(),
+            'customer': lambda env: env['res.partner'].get_customer_dashboard_stats(),
         }
+        if dashboard not in providers:
+            raise ValidationError(f"Unknown dashboard: {dashboard}")
+
+        # Versions are bumped after commit and the data is read in a later transaction, so the
+        # data includes at least every change counted in ``current``; a change committed
+        # meanwhile bumps the version again and triggers the next refresh
+        current = self._get_dashboard_version()
+        if version is not None and version == current:
+            return {'version': current, 'not_modified': True}
+        return {'version': current, 'data': self._read_dashboard_data(providers[dashboard])}
+
+    @api.model
+    def _get_inspector_tracking_data(self):
+        """ Build the inspector table in a fixed number of queries, whatever the user count """
+        # 1. Completed counts per inspector in one grouped query (any group means activity)
+        groups = self.read_group(
+            domain=[('inspector_id', '!=', False)],
+            fields=['inspector_id'],
+            groupby=['inspector_id', 'status'],
+            lazy=False,
+        )
+        counts = {}
+        for group in groups:
+            user_id = group['inspector_id'][0]
+            counts.setdefault(user_id, 0)
+            if group['status'] in ('passed', 'failed'):
+                counts[user_id] += group['__count']
+
+        if not counts:
+            return []
+
+        # 2. Next draft task per inspector (earliest start date) in one query
+        self.flush_model(['inspector_id', 'status', 'start_date', 'machine_id'])
+        self.env['inspection.machine'].flush_model(['name'])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (insp.inspector_id)
+                   insp.inspector_id, insp.start_date, machine.name
+              FROM inspection_inspection insp
+         LEFT JOIN inspection_machine machine ON machine.id = insp.machine_id
+             WHERE insp.inspector_id = ANY(%s)
+               AND insp.status = 'draft'
+          ORDER BY insp.inspector_id, insp.start_date ASC NULLS LAST, insp.id ASC
+        """, [list(counts)])
+        next_tasks = {row[0]: (row[1], row[2]) for row in self.env.cr.fetchall()}
+
+        # 3. Only internal users are listed, in the usual res.users order
+        users = self.env['res.users'].sudo().search([('id', 'in', list(counts)), ('share', '=', False)])
+        inspector_data = []
+        for user in users:
+            next_date, next_machine = next_tasks.get(user.id, (False, False))
+            inspector_data.append({
+                'id': user.id,
+                'name': user.name,
+                'done_count': counts[user.id],
+                'next_date': next_date or False,
+                'next_machine': next_machine or False,
+            })
+        return inspector_data
 
     # -------------------------------------------------------------------------
     # STANDARD METHODS
     # -------------------------------------------------------------------------
 
-    @api.depends('name', 'machine_id')
+    @api.depends('name', 'machine_id', 'machine_id.serial_number', 'status', 'expire_date')
     def _compute_qr_code_url(self):
-        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        ICP = self.env['ir.config_parameter'].sudo()
+        base_url = ICP.get_param('web.base.url')
+        # Optional: passed certificates carry a signed payload that can be verified offline
+        signed = ICP.get_param('certification.qr_signed_payload') and certificate_qr.Ed25519PrivateKey
         for rec in self:
-            if rec.machine_id:
+            if signed and rec.status == 'passed' and rec._origin.id:
+                rec.qr_code_url = f"{base_url}/inspection/verify?p={rec._get_qr_payload()}"
+            elif rec.machine_id:
                 rec.qr_code_url = f"{base_url}/machine/info/{rec.machine_id.id}"
             else:
                 rec.qr_code_url = base_url
 
+    @api.model
+    def _get_qr_signing_key(self):
+        """ Ed25519 private key of the database, generated on install / upgrade (see init()) """
+        key = self.env['ir.config_parameter'].sudo().get_param('certification.qr_signing_key')
+        return key or self._init_qr_signing_key()
+
+    @api.model
+    def _init_qr_signing_key(self):
+        """ Store a new signing key unless one exists; return the stored key.
+
+        Two workers generating a key at once must not overwrite each other, or the QR codes
+        signed with the losing key would stop verifying: the insert keeps the first key
+        (a concurrent one fails to serialize and its request is retried).
+        """
+        if not certificate_qr.Ed25519PrivateKey:
+            return False
+        self.env.cr.execute("""
+            INSERT INTO ir_config_parameter (key, value, create_uid, create_date, write_uid, write_date)
+                 VALUES ('certification.qr_signing_key', %(value)s, %(uid)s, now() at time zone 'UTC',
+                         %(uid)s, now() at time zone 'UTC')
+            ON CONFLICT (key) DO NOTHING
+        """, {'value': certificate_qr.generate_private_key(), 'uid': self.env.uid})
+        if self.env.cr.rowcount:
+            self.env.registry.clear_cache()
+        self.env.cr.execute("SELECT value FROM ir_config_parameter WHERE key = 'certification.qr_signing_key'")
+        return self.env.cr.fetchone()[0]
+
+    def _get_qr_payload(self):
+        self.ensure_one()
+        return certificate_qr.sign_payload({
+            'i': self._origin.id,
+            'r': self.name,
+            's': self.machine_id.serial_number or '',
+            'st': self.status,
+            'e': self.expire_date.isoformat() if self.expire_date else '',
+        }, self._get_qr_signing_key())
+
     @api.depends('qr_code_url')
     def _compute_qr_image(self):
+        # The machine URL is shared by all inspections of a machine: one stored PNG per machine.
+        # Signed URLs are per inspection and change with its status: rendered, never stored.
         for rec in self:
-            if qrcode and rec.qr_code_url:
-                qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
-                qr.add_data(rec.qr_code_url)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                buffer = BytesIO()
-                img.save(buffer, format="PNG")
-                rec.qr_image = base64.b64encode(buffer.getvalue())
-            else:
+            if not (qrcode and rec.qr_code_url):
                 rec.qr_image = False
+            elif rec.machine_id and '/inspection/verify?' not in rec.qr_code_url:
+                rec.qr_image = self._get_qr_image(rec.machine_id.id, rec.qr_code_url)
+            else:
+                rec.qr_image = self._render_qr_image(rec.qr_code_url)
+
+    @api.model
+    @tools.ormcache('machine_id', 'url')
+    def _get_qr_image(self, machine_id, url):
+        """ Return the base64 PNG of the machine's ``url``: worker LRU first, then the filestore,
+        then render.
+
+        The PNG is attached to its machine, so it is deleted with it. The encoded URL is kept
+        in the description: after a ``web.base.url`` change the same attachment is re-rendered
+        instead of leaving a stale one behind.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment = Attachment.search([
+            ('res_model', '=', 'inspection.machine'),
+            ('res_id', '=', machine_id),
+            ('name', '=', 'qr_code.png'),
+        ], limit=1)
+        if attachment.description == url:
+            return attachment.datas
+
+        datas = self._render_qr_image(url)
+        if attachment:
+            attachment.write({'datas': datas, 'description': url})
+        else:
+            Attachment.create({
+                'name': 'qr_code.png',
+                'type': 'binary',
+                'datas': datas,
+                'res_model': 'inspection.machine',
+                'res_id': machine_id,
+                'description': url,
+                'mimetype': 'image/png',
+            })
+        return datas
+
+    @api.model
+    @tools.ormcache('url')
+    def _render_qr_image(self, url):
+        qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+        qr.add_data(url)
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        return base64.b64encode(buffer.getvalue())
 
     @api.onchange('customer_id')
     def _onchange_customer_id(self):
@@ -350,28 +615,92 @@ class InspectionInspection(models.Model):
             machine_questions = self.machine_id.custom_question_ids
             all_questions = category_questions + machine_questions
 
-            new_lines = []
-            for q in all_questions:
-                new_lines.append((0, 0, {
-                    'section': q.section,
-                    'serial_no': q.serial_no,
-                    'name': q.name,
-                    'is_accepted': q.is_accepted,
-                    'is_rejected': q.is_rejected,
-                    'is_na': q.is_na,
-                }))
+            new_lines = [(0, 0, self._prepare_checklist_line_vals(q)) for q in all_questions]
             self.line_ids = [(5, 0, 0)] + new_lines
 
+    # -------------------------------------------------------------------------
+    # CHECKLIST INSTANTIATION
+    # -------------------------------------------------------------------------
+    @api.model
+    def _prepare_checklist_line_vals(self, question):
+        return {
+            'section': question.section,
+            'serial_no': question.serial_no,
+            'name': question.name,
+            'result': question.default_result,
+        }
+
+    def _instantiate_checklists(self):
+        """ Copy the category + machine question templates into checklist lines for every
+        inspection of ``self`` that has none yet, with one template search and one batched create.
+        """
+        inspections = self.filtered(lambda i: i.machine_id and not i.line_ids)
+        if not inspections:
+            return self.env['inspection.inspection.line']
+
+        machines = inspections.machine_id
+        questions = self.env['inspection.question'].search([
+            '|',
+            ('category_id', 'in', machines.category_id.ids),
+            ('machine_id', 'in', machines.ids),
+        ])
+        by_category = {}
+        by_machine = {}
+        for question in questions:
+            if question.category_id:
+                by_category.setdefault(question.category_id.id, []).append(question)
+            if question.machine_id:
+                by_machine.setdefault(question.machine_id.id, []).append(question)
+
+        # Question texts are resolved to shared snapshots once for the whole batch
+        snapshots = self.env['inspection.question.snapshot']._get_snapshots(list({
+            (q.section or False, q.serial_no or False, q.name) for q in questions}))
+
+        vals_list = []
+        for insp in inspections:
+            template = by_category.get(insp.machine_id.category_id.id, []) + by_machine.get(insp.machine_id.id, [])
+            for question in template:
+                vals_list.append({
+                    'inspection_id': insp.id,
+                    'snapshot_id': snapshots[(question.section or False, question.serial_no or False, question.name)],
+                    'result': question.default_result,
+                })
+        return self.env['inspection.inspection.line'].create(vals_list)
+
     @api.onchange('start_date')
     def _onchange_start_date(self):
         if self.start_date:
             self.expire_date = self.start_date + relativedelta(months=6)
 
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('inspection.inspection') or 'New'
-        return super(InspectionInspection, self).create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('name', 'New') == 'New':
+                vals['name'] = self.env['ir.sequence'].next_by_code('inspection.inspection') or 'New'
+        res = super(InspectionInspection, self).create(vals_list)
+        res.filtered(lambda i: i.status == 'passed').machine_id._refresh_compliance_snapshot()
+        self._bump_dashboard_version()
+        return res
+
+    def write(self, vals):
+        # A new expiry date (renewal / correction) restarts the reminder sequence
+        if 'expire_date' in vals and 'reminder_stage' not in vals:
+            vals = dict(vals, reminder_stage=0, reminder_sent_date=False)
+        # Keep the machine compliance snapshot in sync (old machine too when an inspection is moved)
+        touches_compliance = bool({'status', 'expire_date', 'machine_id'} & set(vals))
+        old_machines = self.machine_id if 'machine_id' in vals else self.env['inspection.machine']
+        res = super(InspectionInspection, self).write(vals)
+        if touches_compliance:
+            (old_machines | self.machine_id)._refresh_compliance_snapshot()
+        self._bump_dashboard_version()
+        return res
+
+    def unlink(self):
+        machines = self.filtered(lambda i: i.status == 'passed').machine_id
+        res = super(InspectionInspection, self).unlink()
+        machines.exists()._refresh_compliance_snapshot()
+        self._bump_dashboard_version()
+        return res
 
     # -------------------------------------------------------------------------
     # ACTION METHODS
@@ -389,22 +718,9 @@ class InspectionInspection(models.Model):
         }
 
     def action_pass(self):
+        # Certificates are rendered in batches by the queue worker, so bulk approvals return at once
         self.write({'status': 'passed'})
-        try:
-            report = self.env.ref('certification.action_report_certificate')
-            pdf_content, _ = report._render_qweb_pdf(self.id)
-
-            self.env['ir.attachment'].create({
-                'name': f"Certificate - {self.name}.pdf",
-                'type': 'binary',
-                'datas': base64.b64encode(pdf_content),
-                'res_model': 'inspection.inspection',
-                'res_id': self.id,
-                'mimetype': 'application/pdf'
-            })
-            _logger.info(f"Certificate PDF generated successfully for inspection {self.name}")
-        except Exception as e:
-            _logger.error(f"Failed to generate certificate PDF for inspection {self.name}: {e}")
+        self.env['inspection.certificate.job'].sudo()._enqueue(self)
         return True
 
     def action_fail(self):
@@ -413,6 +729,21 @@ class InspectionInspection(models.Model):
     def action_reset_draft(self):
         self.write({'status': 'draft'})
 
+    def action_export_certificates(self):
+        """ Bulk export of the selected passed inspections as a ZIP of certificates """
+        export = self.env['inspection.certificate.export'].create({
+            'name': f"Certificates ({len(self)})",
+            'domain': str([('id', 'in', self.ids)]),
+        })
+        export.action_prepare()
+        return {
+            'name': 'Certificate Export',
+            'type': 'ir.actions.act_window',
+            'res_model': 'inspection.certificate.export',
+            'view_mode': 'form',
+            'res_id': export.id,
+        }
+
     def action_download_qr(self):
         self.ensure_one()
         return {
@@ -421,20 +752,116 @@ class InspectionInspection(models.Model):
             'target': 'self',
         }
 
+    @api.model
+    def _get_reminder_offsets(self):
+        """ Days before expiry at which reminders go out, largest first (system parameter) """
+        param = self.env['ir.config_parameter'].sudo().get_param('certification.reminder_offsets', '60,30,7')
+        return sorted({int(x) for x in param.split(',') if x.strip().isdigit() and int(x) > 0}, reverse=True)
+
     @api.model
     def action_send_expiration_reminders(self):
+        """ Remind every certificate whose reminder window opened since its last reminder.
+
+        Each offset (e.g. 60/30/7 days) is a window: once ``expire_date - today`` drops under it,
+        the certificate is due until that stage is recorded, so a skipped or late cron run
+        catches up on the next one. Everything is fetched with one indexed range query.
+        """
+        offsets = self._get_reminder_offsets()
+        if not offsets:
+            return
         today = fields.Date.today()
-        target_date = today + relativedelta(days=30)
+
+        window_domains = [
+            ['&', ('expire_date', '<=', today + relativedelta(days=offset)),
+             '|', ('reminder_stage', '=', 0), ('reminder_stage', '>', offset)]
+            for offset in offsets
+        ]
         expiring_inspections = self.search([
             ('status', '=', 'passed'),
-            ('expire_date', '=', target_date)
-        ])
-        template = self.env.ref('certification.mail_template_inspection_expiration', raise_if_not_found=False)
-        if not template:
+            ('expire_date', '>=', today),
+            ('expire_date', '<=', today + relativedelta(days=offsets[0])),
+        ] + expression.OR(window_domains))
+        if not expiring_inspections:
             return
+
+        expiring_inspections._send_expiration_reminders()
+
+        # Record the tightest window each certificate has now been reminded for
+        by_stage = {}
         for inspection in expiring_inspections:
-            if inspection.customer_id.email:
-                template.send_mail(inspection.id, force_send=True)
+            days_left = (inspection.expire_date - today).days
+            stage = min(offset for offset in offsets if offset >= days_left)
+            by_stage.setdefault(stage, self.browse())
+            by_stage[stage] |= inspection
+        for stage, inspections in by_stage.items():
+            inspections.write({'reminder_stage': stage})
+
+    def _send_expiration_reminders(self):
+        """ Queue one reminder per customer for these inspections and mark them as notified.
+
+        Customers with a single expiring certificate get the standard expiration template,
+        customers with several get one digest listing all their machines. Every template
+        field is rendered for the whole batch in a single ``_render_field`` call and the
+        resulting ``mail.mail`` are left to the mail queue instead of being sent inline.
+        """
+        template = self.env.ref('certification.mail_template_inspection_expiration', raise_if_not_found=False)
+        digest_template = self.env.ref('certification.mail_template_inspection_expiration_digest',
+                                       raise_if_not_found=False)
+        if not template or not digest_template:
+            return self.env['mail.mail']
+
+        to_notify = self.filtered(lambda i: i.customer_id.email)
+        by_customer = {}
+        for inspection in to_notify:
+            by_customer.setdefault(inspection.customer_id, self.browse())
+            by_customer[inspection.customer_id] |= inspection
+
+        singles = self.browse()
+        digest_partners = self.env['res.partner']
+        for partner, inspections in by_customer.items():
+            if len(inspections) == 1:
+                singles |= inspections
+            else:
+                digest_partners |= partner
+
+        mail_values = []
+        if singles:
+            rendered = {
+                field: template._render_field(field, singles.ids)
+                for field in ('subject', 'body_html', 'email_from', 'email_to')
+            }
+            for inspection in singles:
+                mail_values.append({
+                    'subject': rendered['subject'][inspection.id],
+                    'body_html': rendered['body_html'][inspection.id],
+                    'email_from': rendered['email_from'][inspection.id],
+                    'email_to': rendered['email_to'][inspection.id],
+                    'model': self._name,
+                    'res_id': inspection.id,
+                    'auto_delete': True,
+                })
+        if digest_partners:
+            add_context = {'expiring_by_partner': {p.id: by_customer[p] for p in digest_partners}}
+            rendered = {
+                field: digest_template._render_field(field, digest_partners.ids, add_context=add_context)
+                for field in ('subject', 'body_html', 'email_from', 'email_to')
+            }
+            for partner in digest_partners:
+                mail_values.append({
+                    'subject': rendered['subject'][partner.id],
+                    'body_html': rendered['body_html'][partner.id],
+                    'email_from': rendered['email_from'][partner.id],
+                    'email_to': rendered['email_to'][partner.id],
+                    'model': 'res.partner',
+                    'res_id': partner.id,
+                    'auto_delete': True,
+                })
+
+        mails = self.env['mail.mail'].sudo().create(mail_values)
+        to_notify.write({'reminder_sent_date': fields.Date.today()})
+        if mails:
+            self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
+        return mails
 
 
 class InspectionInspectionLine(models.Model):
@@ -442,48 +869,145 @@ class InspectionInspectionLine(models.Model):
     _description = 'Inspection Question'
     _order = 'id'
 
-    inspection_id = fields.Many2one('inspection.inspection', string="Inspection", ondelete='cascade')
-
-    section = fields.Char(string="Section")
-    serial_no = fields.Char(string="No")
-    name = fields.Char(string="Examination Item", required=True)
-
-    is_accepted = fields.Boolean(string="A")
-    is_rejected = fields.Boolean(string="R")
-    is_na = fields.Boolean(string="N/A")
+    inspection_id = fields.Many2one('inspection.inspection', string="Inspection", ondelete='cascade', index=True)
+
+    # The question text lives once in a shared snapshot; the line only keeps its result
+    snapshot_id = fields.Many2one('inspection.question.snapshot', string="Question", ondelete='restrict',
+                                  index=True)
+    section = fields.Char(string="Section", compute='_compute_question', inverse='_inverse_question')
+    serial_no = fields.Char(string="No", compute='_compute_question', inverse='_inverse_question')
+    name = fields.Char(string="Examination Item", required=True, compute='_compute_question',
+                       inverse='_inverse_question')
+
+    # Edited with the client-side checklist_result widget (exclusive A / R / N/A, no onchange)
+    result = fields.Selection([
+        ('accepted', 'Accepted'),
+        ('rejected', 'Rejected'),
+        ('na', 'N/A')
+    ], string="Result")
+    is_accepted = fields.Boolean(string="A", compute='_compute_result_flags', inverse='_inverse_result_flags')
+    is_rejected = fields.Boolean(string="R", compute='_compute_result_flags', inverse='_inverse_result_flags')
+    is_na = fields.Boolean(string="N/A", compute='_compute_result_flags', inverse='_inverse_result_flags')
 
     comment = fields.Text(string="Remarks")
     recommendation = fields.Text(string="Recommendations")
     image_ids = fields.One2many('inspection.inspection.image', 'line_id', string="Evidence Photos")
 
-    @api.onchange('is_accepted')
-    def _onchange_accepted(self):
-        if self.is_accepted:
-            self.is_rejected = False
-            self.is_na = False
-
-    @api.onchange('is_rejected')
-    def _onchange_rejected(self):
-        if self.is_rejected:
-            self.is_accepted = False
-            self.is_na = False
-
-    @api.onchange('is_na')
-    def _onchange_na(self):
-        if self.is_na:
-            self.is_accepted = False
-            self.is_rejected = False
+    def init(self):
+        """ Move checklists stored in the former layout (text and three booleans per line) """
+        cr = self.env.cr
+        if not column_exists(cr, self._table, 'is_accepted'):
+            return
+        # 1. One snapshot per distinct question text (same digest as _get_checksum)
+        cr.execute("""
+            INSERT INTO inspection_question_snapshot
+                   (section, serial_no, name, checksum, create_uid, write_uid, create_date, write_date)
+            SELECT DISTINCT ON (checksum) section, serial_no, name, checksum, 1, 1,
+                   NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+              FROM (SELECT section, serial_no, COALESCE(name, '') AS name,
+                           md5(concat_ws(E'\\x1f', COALESCE(section, ''), COALESCE(serial_no, ''),
+                                         COALESCE(name, ''))) AS checksum
+                      FROM inspection_inspection_line) question
+                ON CONFLICT (checksum) DO NOTHING
+        """)
+        # 2. Point the lines to it and fold the booleans into one result code
+        cr.execute("""
+            UPDATE inspection_inspection_line line
+               SET snapshot_id = snap.id,
+                   result = CASE WHEN line.is_accepted THEN 'accepted'
+                                 WHEN line.is_rejected THEN 'rejected'
+                                 WHEN line.is_na THEN 'na' END
+              FROM inspection_question_snapshot snap
+             WHERE snap.checksum = md5(concat_ws(E'\\x1f', COALESCE(line.section, ''),
+                                                COALESCE(line.serial_no, ''), COALESCE(line.name, '')))
+        """)
+        _logger.info(f"Checklist storage: {cr.rowcount} inspection lines moved to question snapshots")
+        # 3. Drop the duplicated columns
+        for column in ('section', 'serial_no', 'name', 'is_accepted', 'is_rejected', 'is_na'):
+            cr.execute(f'ALTER TABLE inspection_inspection_line DROP COLUMN IF EXISTS "{column}"')
+
+    @api.depends('snapshot_id')
+    def _compute_question(self):
+        for line in self:
+            line.section = line.snapshot_id.section
+            line.serial_no = line.snapshot_id.serial_no
+            line.name = line.snapshot_id.name
+
+    def _inverse_question(self):
+        questions = {line: (line.section or False, line.serial_no or False, line.name or '') for line in self}
+        snapshots = self.env['inspection.question.snapshot']._get_snapshots(list(set(questions.values())))
+        for line, question in questions.items():
+            line.snapshot_id = snapshots[question]
+
+    @api.depends('result')
+    def _compute_result_flags(self):
+        for line in self:
+            line.is_accepted = line.result == 'accepted'
+            line.is_rejected = line.result == 'rejected'
+            line.is_na = line.result == 'na'
+
+    def _inverse_result_flags(self):
+        for line in self:
+            if line.is_accepted:
+                line.result = 'accepted'
+            elif line.is_rejected:
+                line.result = 'rejected'
+            elif line.is_na:
+                line.result = 'na'
+            else:
+                line.result = False
 
 
 class InspectionInspectionImage(models.Model):
     _name = 'inspection.inspection.image'
     _description = 'Inspection Evidence Photo'
 
-    line_id = fields.Many2one('inspection.inspection.line', string="Question Line", ondelete='cascade')
+    line_id = fields.Many2one('inspection.inspection.line', string="Question Line", ondelete='cascade', index=True)
     name = fields.Char(string="Name")
     image = fields.Image(string="Photo", max_width=1024, max_height=1024)
+    image_256 = fields.Image(string="Thumbnail", related='image', max_width=256, max_height=256, store=True)
     description = fields.Char(string="Description")
 
+    # Chunked uploads: the original is kept aside until the background worker has resized it
+    checksum = fields.Char(string="SHA-256", index=True, copy=False, readonly=True,
+                           help="Hash of the uploaded original, used to ignore re-sent photos.")
+    original_id = fields.Many2one('ir.attachment', string="Original Upload", readonly=True, ondelete='set null')
+    state = fields.Selection([
+        ('pending', 'Processing'),
+        ('done', 'Ready'),
+        ('failed', 'Failed')
+    ], string="Processing Status", default='done', required=True, index=True)
+
+    @api.model
+    def _cron_process_pending_photos(self):
+        """ Resize uploaded originals (and build thumbnails) outside of the upload request.
+
+        Photos are claimed with SKIP LOCKED, so duplicating the cron gives a pool of workers.
+        """
+        batch_size = int(self.env['ir.config_parameter'].sudo().get_param('certification.photo_batch_size', 50))
+        while True:
+            self.flush_model(['state'])
+            self.env.cr.execute("""
+                SELECT id FROM inspection_inspection_image
+                 WHERE state = 'pending'
+              ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, [batch_size])
+            photos = self.browse([row[0] for row in self.env.cr.fetchall()])
+            if not photos:
+                break
+            for photo in photos:
+                try:
+                    with self.env.cr.savepoint():
+                        # Writing the Image field performs the 1024px resize, the related field the thumbnail
+                        photo.write({'image': photo.original_id.datas, 'state': 'done'})
+                        photo.original_id.unlink()
+                except Exception as e:
+                    _logger.error(f"Failed to process evidence photo {photo.id}: {e}")
+                    photo.write({'state': 'failed'})
+            self.env.cr.commit()
+
 
 # -------------------------------------------------------------------------
 # CUSTOMER PORTAL EXTENSIONS (Docs, Invoices, Payment Status)
@@ -519,7 +1043,7 @@ class InspectionDocument(models.Model):
     name = fields.Char(string="Description", required=True)
     file = fields.Binary(string="File", required=True, attachment=True)
     file_name = fields.Char(string="Filename")
-    partner_id = fields.Many2one('res.partner', string="Customer")
+    partner_id = fields.Many2one('res.partner', string="Customer", index=True)
     upload_date = fields.Date(string="Date", default=fields.Date.today)
 
     # Link to Invoice
@@ -533,6 +1057,11 @@ class InspectionDocument(models.Model):
         ('paid', 'Paid')
     ], string="Payment Status", compute='_compute_payment_status', store=True, readonly=False)
 
+    def init(self):
+        # Portal documents list: keyset pagination per customer in list order
+        create_index(self.env.cr, 'inspection_document_partner_date_idx', self._table,
+                     ['partner_id', 'upload_date DESC NULLS LAST', 'id DESC'])
+
     @api.depends('invoice_id', 'invoice_id.payment_state')
     def _compute_payment_status(self):
         for doc in self:
@@ -1,12 +1,17 @@
 from odoo import models, fields, api
+from odoo.tools.sql import create_index
 from dateutil.relativedelta import relativedelta
 from datetime import date
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
 
 
 class InspectionMachine(models.Model):
     _name = 'inspection.machine'
     _description = 'Machine or Equipment'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'inspection.search.mixin']
 
     name = fields.Char(string="Machine Name/Description", required=True)
     color = fields.Integer(string='Color Index')
@@ -17,12 +22,12 @@ class InspectionMachine(models.Model):
     manufacturer = fields.Char(string="Manufacturer")
     owner_id_no = fields.Char(string="Owner ID / Fleet No.")
 
-    partner_id = fields.Many2one('res.partner', string="Customer", required=True)
-    category_id = fields.Many2one('inspection.category', string="Category", required=True)
+    partner_id = fields.Many2one('res.partner', string="Customer", required=True, index=True)
+    category_id = fields.Many2one('inspection.category', string="Category", required=True, index=True)
 
     custom_question_ids = fields.One2many('inspection.question', 'machine_id', string="Machine Specific Questions")
     inspection_ids = fields.One2many('inspection.inspection', 'machine_id', string="Inspections")
-    inspection_count = fields.Integer(compute='_compute_inspection_count')
+    inspection_count = fields.Integer(compute='_compute_inspection_count', store=True)
 
     # --- SUBSCRIPTION & RECURRING FIELDS ---
     recurring_inspection = fields.Boolean(string="Active Subscription",
@@ -36,10 +41,51 @@ class InspectionMachine(models.Model):
 
     next_inspection_date = fields.Date(string="Next Inspection Date", default=fields.Date.today)
 
+    # Normalized name / serial / model, trigram-indexed for the portal search
+    search_text = fields.Char(compute='_compute_search_text', store=True)
+
+    # --- COMPLIANCE SNAPSHOT (maintained from inspection.inspection, see _refresh_compliance_snapshot) ---
+    last_passed_inspection_id = fields.Many2one('inspection.inspection', string="Last Passed Inspection",
+                                                readonly=True, copy=False)
+    compliance_expire_date = fields.Date(string="Certified Until", readonly=True, copy=False)
+    is_compliant = fields.Boolean(string="Compliant", readonly=True, copy=False, index=True)
+
+    def init(self):
+        # Recurring cron: only subscribed machines, scanned by due date
+        create_index(self.env.cr, 'inspection_machine_recurring_due_idx', self._table,
+                     ['next_inspection_date', 'id'], where="recurring_inspection")
+        # Portal machines list: keyset pagination per customer
+        create_index(self.env.cr, 'inspection_machine_partner_id_id_idx', self._table, ['partner_id', 'id'])
+        self._init_search_index()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env['inspection.inspection']._bump_dashboard_version()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['inspection.inspection']._bump_dashboard_version()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['inspection.inspection']._bump_dashboard_version()
+        return res
+
     @api.depends('inspection_ids')
     def _compute_inspection_count(self):
+        groups = self.env['inspection.inspection'].read_group(
+            [('machine_id', 'in', self.ids)], ['machine_id'], ['machine_id'])
+        counts = {g['machine_id'][0]: g['machine_id_count'] for g in groups}
+        for record in self:
+            record.inspection_count = counts.get(record._origin.id, 0)
+
+    @api.depends('name', 'serial_number', 'model_no')
+    def _compute_search_text(self):
         for record in self:
-            record.inspection_count = len(record.inspection_ids)
+            record.search_text = self._build_search_text(record.name, record.serial_number, record.model_no)
 
     def action_view_inspections(self):
         self.ensure_one()
@@ -62,52 +108,130 @@ class InspectionMachine(models.Model):
             'context': {'default_machine_id': self.id, 'default_customer_id': self.partner_id.id}
         }
 
+    # --- COMPLIANCE SNAPSHOT ---
+    def _refresh_compliance_snapshot(self):
+        """ Called whenever a passed inspection of these machines changes """
+        if self:
+            self._update_compliance_snapshot(self.ids)
+
+    @api.model
+    def _update_compliance_snapshot(self, machine_ids=None):
+        """ Store the passed inspection with the furthest expiry per machine, in a single UPDATE """
+        self.env['inspection.inspection'].flush_model(['machine_id', 'status', 'expire_date'])
+        where = "WHERE m.id = ANY(%(ids)s)" if machine_ids is not None else ""
+        self.env.cr.execute(f"""
+            UPDATE inspection_machine machine
+               SET last_passed_inspection_id = snap.inspection_id,
+                   compliance_expire_date = snap.expire_date,
+                   is_compliant = COALESCE(snap.expire_date >= %(today)s, FALSE)
+              FROM (SELECT m.id AS machine_id, latest.id AS inspection_id, latest.expire_date
+                      FROM inspection_machine m
+                 LEFT JOIN LATERAL (
+                               SELECT insp.id, insp.expire_date
+                                 FROM inspection_inspection insp
+                                WHERE insp.machine_id = m.id AND insp.status = 'passed'
+                             ORDER BY insp.expire_date DESC NULLS LAST, insp.id DESC
+                                LIMIT 1
+                           ) latest ON TRUE
+                    {where}) snap
+             WHERE machine.id = snap.machine_id
+        """, {'ids': list(machine_ids or []), 'today': fields.Date.today()})
+        self.invalidate_model(['last_passed_inspection_id', 'compliance_expire_date', 'is_compliant'])
+
+    @api.model
+    def _cron_rollover_compliance(self):
+        """ Nightly: certificates that expired since the last run make their machine non-compliant """
+        self.env.cr.execute("""
+            UPDATE inspection_machine
+               SET is_compliant = FALSE
+             WHERE is_compliant AND compliance_expire_date < %s
+        """, [fields.Date.today()])
+        if self.env.cr.rowcount:
+            self.env['inspection.inspection']._bump_dashboard_version()
+        self.invalidate_model(['is_compliant'])
+
     # --- CRON JOB: GENERATE RECURRING INSPECTIONS ---
     @api.model
     def _cron_generate_recurring_inspections(self):
-        """ This method is called by the System Scheduler every day """
+        """ This method is called by the System Scheduler every day.
+
+        Due machines are processed in id order, in chunks committed one by one. No checkpoint
+        is needed to resume a killed run: a committed chunk moved its machines'
+        ``next_inspection_date`` forward and gave them an auto-renewal inspection dated today,
+        so they no longer match.
+        """
+        batch_size = int(self.env['ir.config_parameter'].sudo().get_param('certification.recurring_batch_size', 500))
         today = fields.Date.today()
 
-        # 1. Find machines that are Active AND due for inspection
-        machines_due = self.search([
-            ('recurring_inspection', '=', True),
-            ('next_inspection_date', '<=', today)
-        ])
-
-        for machine in machines_due:
-            # 2. Create the Draft Inspection
-            self.env['inspection.inspection'].create({
-                'machine_id': machine.id,
-                'customer_id': machine.partner_id.id,
-                'status': 'draft',
-                'name': f"Auto-Renewal: {machine.name} ({today})",
-                'start_date': today,
-                'inspection_type': 'thorough',
-                'company_id': self.env.company.id,  # Ensure company set if using multi-company
-            })
+        started = time.time()
+        machine_total = inspection_total = 0
+        last_id = 0
+        while True:
+            # 1. Find the next chunk of machines that are Active AND due for inspection
+            machines = self.search([
+                ('recurring_inspection', '=', True),
+                ('next_inspection_date', '<=', today),
+                ('id', '>', last_id),
+                # Still due after a catch-up (overdue by several intervals): already renewed today.
+                # Only this cron's own inspections count, not e.g. a customer request from the portal.
+                ('inspection_ids', 'not any', [('name', '=like', 'Auto-Renewal: %'), ('start_date', '=', today)]),
+            ], order='id', limit=batch_size)
+            if not machines:
+                break
+
+            inspections = machines._generate_recurring_inspections(today)
+            machine_total += len(machines)
+            inspection_total += len(inspections)
+            last_id = machines[-1].id
+            self.env.cr.commit()
+
+        elapsed = time.time() - started
+        _logger.info(
+            f"Recurring inspections: {inspection_total} created for {machine_total} machines "
+            f"in {elapsed:.1f}s ({inspection_total / elapsed if elapsed else 0:.1f}/s)"
+        )
+        return {'machines': machine_total, 'inspections': inspection_total, 'seconds': elapsed}
+
+    def _generate_recurring_inspections(self, today):
+        """ Create the draft inspections of a chunk of due machines with batched writes """
+        # 2. Create the Draft Inspections
+        inspections = self.env['inspection.inspection'].create([{
+            'machine_id': machine.id,
+            'customer_id': machine.partner_id.id,
+            'status': 'draft',
+            'name': f"Auto-Renewal: {machine.name} ({today})",
+            'start_date': today,
+            'inspection_type': 'thorough',
+            'company_id': self.env.company.id,  # Ensure company set if using multi-company
+        } for machine in self])
 
-            # 3. Calculate next date based on interval
+        # 3. Calculate next dates based on interval, one UPDATE per distinct date
+        by_date = {}
+        for machine in self:
             months_to_add = int(machine.inspection_interval)
             new_date = machine.next_inspection_date + relativedelta(months=months_to_add)
-            machine.write({'next_inspection_date': new_date})
+            by_date.setdefault(new_date, self.browse())
+            by_date[new_date] |= machine
+        for new_date, machines in by_date.items():
+            machines.write({'next_inspection_date': new_date})
+
+        # Log in chatter
+        self._message_log_batch({
+            machine.id: f"System auto-generated inspection for {today}. Next run: {machine.next_inspection_date}"
+            for machine in self
+        })
 
-            # Log in chatter
-            machine.message_post(body=f"System auto-generated inspection for {today}. Next run: {new_date}")
+        # 4. Fill every generated checklist in one batch
+        inspections._instantiate_checklists()
+        return inspections
 
     # --- DASHBOARD DATA FETCHER ---
     @api.model
     def get_machine_dashboard_stats(self):
-        today = fields.Date.today()
-
         # 1. KPIs
         total_machines = self.search_count([])
 
-        compliant_ids = self.env['inspection.inspection'].search([
-            ('status', '=', 'passed'),
-            ('expire_date', '>=', today)
-        ]).mapped('machine_id.id')
-
-        compliant_count = len(set(compliant_ids))
+        compliant_count = self.search_count([('is_compliant', '=', True)])
         non_compliant_count = total_machines - compliant_count
 
         manufacturers = self.read_group([], ['manufacturer'], ['manufacturer'])
@@ -134,7 +258,7 @@ class InspectionMachine(models.Model):
 
         # 3. Non-Compliant List
         non_compliant_recs = self.search_read(
-            domain=[('id', 'not in', compliant_ids)],
+            domain=[('is_compliant', '=', False)],
             fields=['name', 'serial_number', 'partner_id', 'manufacturer'],
             limit=20
         )
@@ -0,0 +1,149 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.tools import config
+import hashlib
+import logging
+import os
+import uuid
+
+from dateutil.relativedelta import relativedelta
+
+_logger = logging.getLogger(__name__)
+
+
+class InspectionPhotoUpload(models.Model):
+    _name = 'inspection.photo.upload'
+    _description = 'Evidence Photo Upload Session'
+
+    token = fields.Char(string="Token", required=True, index=True, copy=False, readonly=True,
+                        default=lambda self: uuid.uuid4().hex)
+    line_id = fields.Many2one('inspection.inspection.line', string="Question Line", required=True,
+                              ondelete='cascade')
+    filename = fields.Char(string="Filename")
+    description = fields.Char(string="Description")
+    size = fields.Integer(string="Expected Size", required=True)
+    checksum = fields.Char(string="Expected SHA-256", required=True)
+    received = fields.Integer(string="Bytes Received", default=0, readonly=True)
+    image_id = fields.Many2one('inspection.inspection.image', string="Photo", readonly=True, ondelete='set null')
+
+    _sql_constraints = [
+        ('token_uniq', 'unique(token)', "Upload tokens must be unique."),
+    ]
+
+    # -------------------------------------------------------------------------
+    # SESSION API (used by /inspection/photo/upload/* routes)
+    # -------------------------------------------------------------------------
+    @api.model
+    def _start(self, line, filename, size, checksum, description=None):
+        """ Open (or resume) an upload; returns the session, already completed for known photos """
+        max_mb = int(self.env['ir.config_parameter'].sudo().get_param('certification.photo_max_size', 25))
+        if size <= 0 or size > max_mb * 1024 * 1024:
+            raise ValidationError(f"Photos must be between 1 byte and {max_mb} MB.")
+
+        # Re-sent photo: same content already attached to this line
+        existing = self.env['inspection.inspection.image'].search(
+            [('line_id', '=', line.id), ('checksum', '=', checksum)], limit=1)
+        session = self.search([('line_id', '=', line.id), ('checksum', '=', checksum)], limit=1)
+        if existing:
+            if session:
+                session.image_id = existing
+                return session
+            return self.create({'line_id': line.id, 'filename': filename, 'size': size,
+                                'checksum': checksum, 'received': size, 'image_id': existing.id})
+        if session:
+            # Resume: keep what is already on disk
+            session.received = session._get_disk_size()
+            return session
+        return self.create({'line_id': line.id, 'filename': filename, 'size': size,
+                            'checksum': checksum, 'description': description})
+
+    def _get_temp_path(self):
+        self.ensure_one()
+        folder = os.path.join(config['data_dir'], 'certification_uploads', self.env.cr.dbname)
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, self.token)
+
+    def _get_disk_size(self):
+        path = self._get_temp_path()
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def _append_chunk(self, offset, stream):
+        """ Write a chunk at ``offset``; chunks already on disk are acknowledged, gaps are refused """
+        self.ensure_one()
+        if self.image_id:
+            return self.received
+        on_disk = self._get_disk_size()
+        if offset > on_disk:
+            raise ValidationError(f"Missing data: expected offset {on_disk}, got {offset}.")
+        if offset < 0 or offset > self.size:
+            raise ValidationError(f"Invalid offset {offset} for a {self.size} bytes upload.")
+
+        path = self._get_temp_path()
+        # Never write past the announced size: read at most what is left, plus one byte to see
+        # an overflow coming, and refuse that block before it reaches the disk
+        remaining = self.size - offset
+        overflow = False
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.seek(offset)
+            f.truncate()
+            while block := stream.read(min(64 * 1024, remaining + 1)):
+                if len(block) > remaining:
+                    overflow = True
+                    break
+                f.write(block)
+                remaining -= len(block)
+            received = f.tell()
+        if overflow:
+            os.remove(path)
+            self.received = 0
+            raise ValidationError("Upload larger than announced, please restart it.")
+        self.received = received
+        if received == self.size:
+            self._finalize()
+        return received
+
+    def _finalize(self):
+        """ Verify the assembled file and hand it to the background resize worker """
+        self.ensure_one()
+        path = self._get_temp_path()
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(64 * 1024), b''):
+                sha.update(block)
+        if sha.hexdigest() != self.checksum:
+            os.remove(path)
+            self.received = 0
+            raise ValidationError("Checksum mismatch, please restart the upload.")
+
+        with open(path, 'rb') as f:
+            original = self.env['ir.attachment'].sudo().create({
+                'name': self.filename or f"{self.token}.jpg",
+                'raw': f.read(),
+                'res_model': 'inspection.inspection.image',
+            })
+        image = self.env['inspection.inspection.image'].create({
+            'line_id': self.line_id.id,
+            'name': self.filename,
+            'description': self.description,
+            'checksum': self.checksum,
+            'original_id': original.id,
+            'state': 'pending',
+        })
+        original.res_id = image.id
+        self.image_id = image
+        os.remove(path)
+
+        cron = self.env.ref('certification.ir_cron_process_evidence_photos', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return image
+
+    @api.model
+    def _gc_stale_uploads(self):
+        """ Drop sessions (and their partial files) untouched for two days """
+        stale = self.search([('write_date', '<', fields.Datetime.now() - relativedelta(days=2))])
+        for session in stale:
+            path = session._get_temp_path()
+            if os.path.exists(path):
+                os.remove(path)
+        stale.unlink()
@@ -0,0 +1,48 @@
+from odoo import models, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+import re
+
+
+class InspectionSearchMixin(models.AbstractModel):
+    """ Portal search over a single stored ``search_text`` column.
+
+    Models inheriting this mixin define ``search_text`` as a stored compute built with
+    ``_build_search_text``. The column gets a trigram GIN index, so a portal search is
+    one indexed ``ilike`` instead of an OR of ``ilike`` across joined tables, and the
+    matches can be ranked by trigram similarity.
+    """
+    _name = 'inspection.search.mixin'
+    _description = 'Inspection Portal Search'
+
+    @api.model
+    def _normalize_search_text(self, value):
+        return re.sub(r'\s+', ' ', (value or '').strip().lower())
+
+    @api.model
+    def _build_search_text(self, *values):
+        return ' '.join(self._normalize_search_text(v) for v in values if v)
+
+    def _init_search_index(self):
+        if self.env.registry.has_trigram:
+            create_index(self.env.cr, f'{self._table}_search_text_trgm_idx', self._table,
+                         ['search_text gin_trgm_ops'], method='gin')
+
+    @api.model
+    def _portal_search(self, domain, search, offset=0, limit=None):
+        """ Records of ``domain`` matching ``search``, best matches first (trigram similarity) """
+        term = self._normalize_search_text(search)
+        domain = domain + [('search_text', 'ilike', term)]
+        if not self.env.registry.has_trigram:
+            return self.search(domain, offset=offset, limit=limit)
+
+        self.flush_model(['search_text'])
+        query = self._search(domain)
+        self.env.cr.execute(SQL(
+            """ SELECT id FROM %s
+                 WHERE id IN (%s)
+              ORDER BY word_similarity(%s, search_text) DESC, id DESC
+                 LIMIT %s OFFSET %s """,
+            SQL.identifier(self._table), query.subselect(), term, limit, offset,
+        ))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
@@ -0,0 +1,9 @@
+from odoo import models, fields
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    # Set by the portal upload route: only these files of a machine are listed to its customer,
+    # never the ones staff attached to the machine or its chatter
+    is_maintenance_log = fields.Boolean(string="Portal Maintenance Log", readonly=True, copy=False)
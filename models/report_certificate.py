@@ -0,0 +1,46 @@
+from odoo import models, api
+
+
+class ReportCertificate(models.AbstractModel):
+    _name = 'report.certification.report_certificate_template'
+    _description = 'Inspection Certificate Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """ Load every line and evidence photo of the batch up front.
+
+        Question texts come from the shared snapshots, read once for the batch.
+        The certificate only embeds the stored 256px thumbnails; their attachments are
+        fetched in one query for all the printed inspections instead of photo by photo.
+        The appendix report does the same with the full-resolution images.
+        """
+        docs = self.env['inspection.inspection'].browse(docids)
+        docs.line_ids.snapshot_id.mapped('name')
+        photos = docs.line_ids.image_ids
+        photos.mapped(self._photo_field())
+
+        photos_by_line = {}
+        for photo in photos:
+            photos_by_line.setdefault(photo.line_id.id, []).append(photo)
+
+        return {
+            'doc_ids': docids,
+            'doc_model': 'inspection.inspection',
+            'docs': docs,
+            'photos_by_line': photos_by_line,
+        }
+
+    @api.model
+    def _photo_field(self):
+        return 'image_256'
+
+
+class ReportCertificatePhotos(models.AbstractModel):
+    _name = 'report.certification.report_certificate_photos'
+    _inherit = 'report.certification.report_certificate_template'
+    _description = 'Inspection Evidence Photos Appendix'
+
+    @api.model
+    def _photo_field(self):
+        # The appendix is the place for the full-resolution photos
+        return 'image'
@@ -1,4 +1,11 @@
 from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+import time
+
+# Per-worker cache of the customer analytics payload:
+# {(dbname, uid, company_ids): (expires_at, version, payload)}
+_CUSTOMER_ANALYTICS_CACHE = {}
 
 
 class ResPartner(models.Model):
@@ -19,48 +26,66 @@ class ResPartner(models.Model):
             vals['tz'] = 'Africa/Cairo'
         return super().write(vals)
 
+    def init(self):
+        # Trigram indexes for the dashboard directory search (name / email / city ilike)
+        if self.env.registry.has_trigram:
+            for column in ('name', 'email', 'city'):
+                create_index(self.env.cr, f'res_partner_{column}_certification_trgm_idx', self._table,
+                             [f'{column} gin_trgm_ops'], method='gin')
+
     # =========================================================
     # EXISTING FIELDS
     # =========================================================
     machine_ids = fields.One2many('inspection.machine', 'partner_id', string="Machines")
-    machine_count = fields.Integer(compute='_compute_machine_count', string="Machine Count")
+    machine_count = fields.Integer(compute='_compute_machine_count', string="Machine Count", store=True)
     inspection_ids = fields.One2many('inspection.inspection', 'customer_id', string="Inspections")
-    inspection_count = fields.Integer(compute='_compute_inspection_count', string="Inspection Count")
-    certificate_count = fields.Integer(compute='_compute_certificate_count', string="Certificates")
+    inspection_count = fields.Integer(compute='_compute_inspection_count', string="Inspection Count", store=True)
+    certificate_count = fields.Integer(compute='_compute_certificate_count', string="Certificates", store=True)
     category_ids = fields.Many2many('inspection.category', compute='_compute_categories', string="Linked Categories")
-    category_count = fields.Integer(compute='_compute_category_count', string="Category Count")
+    category_count = fields.Integer(compute='_compute_category_count', string="Category Count", store=True)
     inspection_document_ids = fields.One2many('inspection.document', 'partner_id', string="Portal Documents")
 
     # =========================================================
     # COMPUTE METHODS
+    # Counters are stored and recomputed by the ORM when the related records change;
+    # each compute runs one grouped query for the whole batch of partners.
     # =========================================================
     @api.depends('machine_ids')
     def _compute_machine_count(self):
+        groups = self.env['inspection.machine'].read_group(
+            [('partner_id', 'in', self.ids)], ['partner_id'], ['partner_id'])
+        counts = {g['partner_id'][0]: g['partner_id_count'] for g in groups}
         for partner in self:
-            partner.machine_count = len(partner.machine_ids)
+            partner.machine_count = counts.get(partner._origin.id, 0)
 
     @api.depends('inspection_ids')
     def _compute_inspection_count(self):
+        groups = self.env['inspection.inspection'].read_group(
+            [('customer_id', 'in', self.ids)], ['customer_id'], ['customer_id'])
+        counts = {g['customer_id'][0]: g['customer_id_count'] for g in groups}
         for partner in self:
-            partner.inspection_count = len(partner.inspection_ids)
+            partner.inspection_count = counts.get(partner._origin.id, 0)
 
     @api.depends('inspection_ids.status')
     def _compute_certificate_count(self):
+        groups = self.env['inspection.inspection'].read_group(
+            [('customer_id', 'in', self.ids), ('status', '=', 'passed')], ['customer_id'], ['customer_id'])
+        counts = {g['customer_id'][0]: g['customer_id_count'] for g in groups}
         for partner in self:
-            partner.certificate_count = self.env['inspection.inspection'].search_count([
-                ('customer_id', '=', partner.id),
-                ('status', '=', 'passed')
-            ])
+            partner.certificate_count = counts.get(partner._origin.id, 0)
 
     @api.depends('machine_ids.category_id')
     def _compute_categories(self):
         for partner in self:
             partner.category_ids = partner.machine_ids.mapped('category_id')
 
-    @api.depends('category_ids')
+    @api.depends('machine_ids.category_id')
     def _compute_category_count(self):
+        groups = self.env['inspection.machine'].read_group(
+            [('partner_id', 'in', self.ids)], ['partner_id', 'category_id:count_distinct'], ['partner_id'])
+        counts = {g['partner_id'][0]: g['category_id'] for g in groups}
         for partner in self:
-            partner.category_count = len(partner.category_ids)
+            partner.category_count = counts.get(partner._origin.id, 0)
 
     # =========================================================
     # SMART BUTTONS
@@ -109,95 +134,142 @@ class ResPartner(models.Model):
         }
 
     # =========================================================
-    # DASHBOARD DATA (FIXED: Added 'all_customers')
+    # DASHBOARD DIRECTORY (paginated, searched server-side)
     # =========================================================
     @api.model
-    def get_customer_dashboard_stats(self):
-        """Data for the refined Customer Dashboard"""
-
-        Machine = self.env['inspection.machine']
-        Inspection = self.env['inspection.inspection']
-        Partner = self.env['res.partner']
-
-        # 1. KPIs
-        customers_with_machines = Machine.read_group([], ['partner_id'], ['partner_id'])
-        total_active = len(customers_with_machines)
-
-        # 2. Charts: Top 5 Customers
-        fleet_counts = Machine.read_group(
-            domain=[],
-            fields=['partner_id'],
-            groupby=['partner_id'],
-            orderby='partner_id_count desc',
-            limit=5
-        )
+    def get_customer_directory(self, query='', offset=0, limit=40):
+        """One page of the Customer Dashboard directory.
 
-        top_clients_labels = []
-        top_clients_data = []
-        top_client_id = False
-
-        for group in fleet_counts:
-            if group['partner_id']:
-                top_clients_labels.append(group['partner_id'][1])
-                top_clients_data.append(group['partner_id_count'])
-                if not top_client_id:
-                    top_client_id = group['partner_id'][0]
-
-        top_client_name = top_clients_labels[0] if top_clients_labels else "N/A"
-        top_client_count = top_clients_data[0] if top_clients_data else 0
-
-        # 3. List: Risk Watchlist
-        failed_inspections = Inspection.read_group(
-            [('status', '=', 'failed')],
-            ['customer_id'],
-            ['customer_id'],
-            orderby='customer_id_count desc',
-            limit=5
-        )
+        Rows are lightweight: the avatar is returned as a URL (browser-cached) instead
+        of an inline base64 blob. ``has_more`` tells the client whether to keep scrolling.
+        """
+        domain = ['|', ('machine_ids', '!=', False), ('customer_rank', '>', 0)]
+        query = (query or '').strip()
+        if query:
+            domain += ['|', '|', ('name', 'ilike', query), ('email', 'ilike', query), ('city', 'ilike', query)]
 
-        risk_watchlist = []
-        risk_ids = []
-        for group in failed_inspections:
-            if group['customer_id']:
-                pid = group['customer_id'][0]
-                partner = self.browse(pid)
-                risk_ids.append(pid)
-                risk_watchlist.append({
-                    'id': pid,
-                    'name': group['customer_id'][1],
-                    'phone': partner.phone or '',
-                    'fail_count': group['customer_id_count']
-                })
-
-        # =========================================================
-        # 4. FULL DIRECTORY LIST (UPDATED FILTER)
-        # =========================================================
-        # We removed the strict filter. Now it shows ALL active partners.
-        all_customers = Partner.search_read(
-            domain=[('active', '=', True), ('type', '!=', 'private')],
-            fields=['id', 'name', 'city', 'email', 'phone', 'image_128', 'machine_count', 'inspection_count'],
-            order='create_date desc'  # Newest created customers show first
+        rows = self.search_read(
+            domain=domain,
+            fields=['id', 'name', 'street', 'city', 'email', 'phone', 'mobile', 'machine_count',
+                    'inspection_count', 'write_date'],
+            offset=offset,
+            limit=limit + 1,
+            order='name asc, id asc'
         )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        risk_ids = {r['id'] for r in self.get_customer_dashboard_stats()['lists']['risk_watchlist']}
+
+        for row in rows:
+            unique = int(row.pop('write_date').timestamp())
+            row['image_url'] = f"/web/image/res.partner/{row['id']}/avatar_128?unique={unique}"
+            row['is_risk'] = row['id'] in risk_ids
+
+        return {'records': rows, 'offset': offset + len(rows), 'has_more': has_more}
+
+    # =========================================================
+    # CUSTOMER ANALYTICS (single service for the Customer Dashboard)
+    # =========================================================
+    @api.model
+    def get_customer_dashboard_stats(self):
+        """Data for the Customer Dashboard: KPIs, market share chart and risk watchlist.
+
+        Only machines and inspections the user can read in the active companies are counted
+        (record rules apply), so the payload is cached per database, user and companies. An
+        entry is reused while the dashboard version (bumped on every machine / inspection
+        write, in any worker) is unchanged, for at most ``certification.dashboard_cache_ttl``
+        seconds (default 60).
+        """
+        self.env['inspection.machine'].check_access('read')
+        self.env['inspection.inspection'].check_access('read')
+        key = (self.env.cr.dbname, self.env.uid, tuple(sorted(self.env.companies.ids)))
+        version = self.env['inspection.inspection']._get_dashboard_version()
+        cached = _CUSTOMER_ANALYTICS_CACHE.get(key)
+        if cached and cached[0] > time.monotonic() and cached[1] == version:
+            return cached[2]
+
+        ttl = int(self.env['ir.config_parameter'].sudo().get_param('certification.dashboard_cache_ttl', 60))
+        payload = self.env['inspection.inspection']._read_dashboard_data(
+            lambda env: env['res.partner']._compute_customer_analytics())
+        _CUSTOMER_ANALYTICS_CACHE[key] = (time.monotonic() + ttl, version, payload)
+        return payload
+
+    @api.model
+    def _compute_customer_analytics(self):
+        """Fleet sizes and failure counts per customer, ranked, in one SQL pass"""
+        self.env['inspection.machine'].flush_model(['partner_id'])
+        self.env['inspection.inspection'].flush_model(['customer_id', 'status'])
+        self.flush_model(['name', 'phone'])
+        company_ids = self.env.companies.ids
+        # Visible records only: record rules are applied by _search(), companies by the domains
+        machines = self.env['inspection.machine']._search([
+            ('partner_id', '!=', False),
+            '|', ('partner_id.company_id', '=', False), ('partner_id.company_id', 'in', company_ids),
+        ])
+        failed_inspections = self.env['inspection.inspection']._search([
+            ('status', '=', 'failed'),
+            ('customer_id', '!=', False),
+            ('company_id', 'in', company_ids),
+        ])
+        self.env.cr.execute(SQL("""
+            WITH fleet AS (
+                SELECT partner_id, COUNT(*) AS machine_count
+                  FROM inspection_machine
+                 WHERE id IN (%s)
+              GROUP BY partner_id
+            ), failures AS (
+                SELECT customer_id AS partner_id, COUNT(*) AS fail_count
+                  FROM inspection_inspection
+                 WHERE id IN (%s)
+              GROUP BY customer_id
+            ), ranked AS (
+                SELECT COALESCE(fleet.partner_id, failures.partner_id) AS partner_id,
+                       COALESCE(fleet.machine_count, 0) AS machine_count,
+                       COALESCE(failures.fail_count, 0) AS fail_count,
+                       ROW_NUMBER() OVER (ORDER BY COALESCE(fleet.machine_count, 0) DESC,
+                                                   COALESCE(fleet.partner_id, failures.partner_id)) AS fleet_rank,
+                       ROW_NUMBER() OVER (ORDER BY COALESCE(failures.fail_count, 0) DESC,
+                                                   COALESCE(fleet.partner_id, failures.partner_id)) AS risk_rank
+                  FROM fleet
+             FULL JOIN failures ON failures.partner_id = fleet.partner_id
+            )
+            SELECT ranked.partner_id, partner.name, partner.phone, ranked.machine_count, ranked.fail_count,
+                   ranked.fleet_rank, ranked.risk_rank, (SELECT COUNT(*) FROM fleet) AS active_clients
+              FROM ranked
+              JOIN res_partner partner ON partner.id = ranked.partner_id
+             WHERE (ranked.fleet_rank <= 5 AND ranked.machine_count > 0)
+                OR (ranked.risk_rank <= 5 AND ranked.fail_count > 0)
+        """, machines.subselect(), failed_inspections.subselect()))
+        rows = self.env.cr.dictfetchall()
+
+        fleet_rows = sorted((r for r in rows if r['fleet_rank'] <= 5 and r['machine_count']),
+                            key=lambda r: r['fleet_rank'])
+        risk_rows = sorted((r for r in rows if r['risk_rank'] <= 5 and r['fail_count']),
+                           key=lambda r: r['risk_rank'])
 
-        # Mark risky customers
-        for cust in all_customers:
-            cust['is_risk'] = cust['id'] in risk_ids
+        largest_fleet = {'id': False, 'name': 'None', 'count': 0}
+        if fleet_rows:
+            top = fleet_rows[0]
+            largest_fleet = {'id': top['partner_id'], 'name': top['name'], 'count': top['machine_count']}
 
         return {
             'kpi': {
-                'total_active': total_active,
-                'top_client_name': top_client_name,
-                'top_client_count': top_client_count,
-                'top_client_id': top_client_id,
+                'active_clients': rows[0]['active_clients'] if rows else 0,
+                'largest_fleet': largest_fleet,
             },
             'charts': {
-                'top_clients': {
-                    'labels': top_clients_labels,
-                    'data': top_clients_data
+                'market_share': {
+                    'labels': [r['name'] for r in fleet_rows],
+                    'data': [r['machine_count'] for r in fleet_rows],
                 }
             },
             'lists': {
-                'risk_watchlist': risk_watchlist,
-                'all_customers': all_customers
+                'risk_watchlist': [{
+                    'id': r['partner_id'],
+                    'name': r['name'],
+                    'phone': r['phone'] or '',
+                    'count': r['fail_count'],
+                } for r in risk_rows],
             }
         }
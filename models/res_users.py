@@ -0,0 +1,16 @@
+from odoo import models, fields
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    # Reused by every inspection sheet of this inspector instead of a copy per sheet
+    inspector_signature = fields.Binary(string="Inspector Signature", attachment=True)
+
+    @property
+    def SELF_READABLE_FIELDS(self):
+        return super().SELF_READABLE_FIELDS + ['inspector_signature']
+
+    @property
+    def SELF_WRITEABLE_FIELDS(self):
+        return super().SELF_WRITEABLE_FIELDS + ['inspector_signature']
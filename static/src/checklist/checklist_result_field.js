@@ -0,0 +1,70 @@
+/** @odoo-module */
+
+import { registry } from "@web/core/registry";
+import { Component } from "@odoo/owl";
+import { standardFieldProps } from "@web/views/fields/standard_field_props";
+
+export const RESULT_CHOICES = [
+    { value: "accepted", label: "A", title: "Accepted", activeClass: "btn-success" },
+    { value: "rejected", label: "R", title: "Rejected", activeClass: "btn-danger" },
+    { value: "na", label: "N/A", title: "Not Applicable", activeClass: "btn-secondary" },
+];
+
+/**
+ * A / R / N/A toggle for checklist results.
+ *
+ * Exclusivity is enforced in the browser: a click only updates the local record, so
+ * filling a checklist costs no server round trip. All line changes are sent with the
+ * form's single save.
+ */
+export class ChecklistResultField extends Component {
+    static template = "certification.ChecklistResultField";
+    static props = {
+        ...standardFieldProps,
+        sectionAction: { type: Boolean, optional: true },
+    };
+
+    setup() {
+        this.choices = RESULT_CHOICES;
+    }
+
+    get value() {
+        return this.props.record.data[this.props.name];
+    }
+
+    get section() {
+        return this.props.record.data.section;
+    }
+
+    select(value) {
+        if (this.props.readonly) return;
+        // Clicking the active choice clears it
+        this.props.record.update({ [this.props.name]: this.value === value ? false : value });
+    }
+
+    /** Lines of the same one2many sharing this line's section */
+    get sectionRecords() {
+        const parent = this.props.record._parentRecord;
+        if (!parent || !this.section) return [];
+        const list = Object.values(parent.data).find((value) => value?.records?.includes(this.props.record));
+        return list ? list.records.filter((rec) => rec.data.section === this.section) : [];
+    }
+
+    acceptSection() {
+        if (this.props.readonly) return;
+        for (const rec of this.sectionRecords) {
+            rec.update({ [this.props.name]: "accepted" });
+        }
+    }
+}
+
+export const checklistResultField = {
+    component: ChecklistResultField,
+    displayName: "Checklist Result",
+    supportedTypes: ["selection"],
+    extractProps: ({ options }) => ({
+        sectionAction: Boolean(options.section_action),
+    }),
+};
+
+registry.category("fields").add("checklist_result", checklistResultField);
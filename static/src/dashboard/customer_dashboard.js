@@ -1,8 +1,12 @@
 /** @odoo-module */
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
-import { Component, onWillStart, useRef, onMounted, useState } from "@odoo/owl";
+import { Component, onWillStart, useRef, onMounted, onWillUnmount, useState } from "@odoo/owl";
 import { loadBundle } from "@web/core/assets";
+import { useDebounced } from "@web/core/utils/timing";
+import { AUTO_REFRESH_INTERVAL } from "./dashboard";
+
+const DIRECTORY_PAGE_SIZE = 40;
 
 export class CustomerDashboard extends Component {
     setup() {
@@ -12,45 +16,94 @@ export class CustomerDashboard extends Component {
 
         this.state = useState({
             kpi: { active_clients: 0, largest_fleet: {id: false, name: '-', count: 0} },
-            lists: { risk_watchlist: [], all_customers: [] },
-            searchQuery: ""
+            lists: { risk_watchlist: [] },
+            searchQuery: "",
+            directory: { records: [], offset: 0, hasMore: true, loading: false }
         });
 
         this.chartData = { market_share: { labels: [], data: [] } };
+        this.debouncedSearch = useDebounced(() => this.loadDirectory(true), 300);
+        this.version = null;
 
         onWillStart(async () => {
             await loadBundle("web.chartjs_lib");
-            await this.loadData();
+            await Promise.all([this.loadData(), this.loadDirectory(true)]);
+        });
+        onMounted(async () => {
+            await this.renderCharts();
+            this.refreshTimer = setInterval(() => this.refresh(), AUTO_REFRESH_INTERVAL);
         });
-        onMounted(async () => { await this.renderCharts(); });
+        onWillUnmount(() => clearInterval(this.refreshTimer));
     }
 
+    async refresh() {
+        if (document.hidden) return;
+        if (await this.loadData()) {
+            await this.renderCharts();
+        }
+    }
+
+    // Returns true when new data was received
     async loadData() {
         try {
-            const result = await this.orm.call("inspection.inspection", "get_customer_dashboard_stats", []);
+            const payload = await this.orm.call("inspection.inspection", "get_dashboard_payload", ["customer", this.version]);
+            this.version = payload.version;
+            if (payload.not_modified) return false;
+            const result = payload.data;
             if (result) {
                 this.state.kpi = result.kpi;
                 this.state.lists = result.lists;
                 this.chartData = result.charts;
             }
+            return true;
         } catch (e) { console.error("Error loading customer stats", e); }
+        return false;
     }
 
-    get filteredCustomers() {
-        const query = this.state.searchQuery.toLowerCase();
-        if (!query) return this.state.lists.all_customers;
+    // Directory is paginated server-side: reset on a new query, append while scrolling
+    async loadDirectory(reset = false) {
+        const directory = this.state.directory;
+        if (!reset && (directory.loading || !directory.hasMore)) return;
+        const query = this.state.searchQuery;
+        directory.loading = true;
+        try {
+            const result = await this.orm.call("res.partner", "get_customer_directory", [], {
+                query,
+                offset: reset ? 0 : directory.offset,
+                limit: DIRECTORY_PAGE_SIZE,
+            });
+            // Drop stale answers when the query changed while this page was in flight
+            if (query !== this.state.searchQuery) return;
+            directory.records = reset ? result.records : [...directory.records, ...result.records];
+            directory.offset = result.offset;
+            directory.hasMore = result.has_more;
+        } catch (e) {
+            console.error("Error loading customer directory", e);
+        } finally {
+            directory.loading = false;
+        }
+    }
+
+    onSearchInput(ev) {
+        this.state.searchQuery = ev.target.value;
+        this.debouncedSearch();
+    }
 
-        return this.state.lists.all_customers.filter(c =>
-            (c.name && c.name.toLowerCase().includes(query)) ||
-            (c.email && c.email.toLowerCase().includes(query)) ||
-            (c.city && c.city.toLowerCase().includes(query))
-        );
+    onScroll(ev) {
+        const el = ev.target;
+        if (el.scrollTop + el.clientHeight >= el.scrollHeight - 300) {
+            this.loadDirectory();
+        }
     }
 
     async renderCharts() {
         if (!window.Chart || !this.chartMarketRef.el) return;
 
-        new Chart(this.chartMarketRef.el, {
+        if (this.chartInstance) {
+            this.chartInstance.destroy();
+        }
+
+        this.chartInstance = new Chart(this.chartMarketRef.el, {
             type: 'bar',
             data: {
                 labels: this.chartData.market_share.labels,
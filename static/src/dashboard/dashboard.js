@@ -1,9 +1,12 @@
 /** @odoo-module */
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
-import { Component, onWillStart, useRef, onMounted, useState } from "@odoo/owl";
+import { Component, onWillStart, useRef, onMounted, onWillUnmount, useState } from "@odoo/owl";
 import { loadBundle } from "@web/core/assets";
 
+// Wall-mounted screens poll for changes; the server answers "not_modified" when nothing moved
+export const AUTO_REFRESH_INTERVAL = 60000;
+
 export class InspectionDashboard extends Component {
     setup() {
         this.orm = useService("orm");
@@ -18,18 +21,34 @@ export class InspectionDashboard extends Component {
         });
 
         this.chartData = { status: [0, 0, 0] };
+        this.version = null;
 
         onWillStart(async () => {
             await loadBundle("web.chartjs_lib");
             await this.loadDashboardData();
         });
 
-        onMounted(async () => { await this.renderCharts(); });
+        onMounted(async () => {
+            await this.renderCharts();
+            this.refreshTimer = setInterval(() => this.refresh(), AUTO_REFRESH_INTERVAL);
+        });
+        onWillUnmount(() => clearInterval(this.refreshTimer));
+    }
+
+    async refresh() {
+        if (document.hidden) return;
+        if (await this.loadDashboardData()) {
+            await this.renderCharts();
+        }
     }
 
+    // Returns true when new data was received
     async loadDashboardData() {
         try {
-            const result = await this.orm.call("inspection.inspection", "get_dashboard_stats", []);
+            const payload = await this.orm.call("inspection.inspection", "get_dashboard_payload", ["main", this.version]);
+            this.version = payload.version;
+            if (payload.not_modified) return false;
+            const result = payload.data;
             if (result) {
                 this.state.kpi = result.kpi || this.state.kpi;
                 this.state.lists = result.lists || this.state.lists;
@@ -42,7 +61,9 @@ export class InspectionDashboard extends Component {
                     this.chartData.status = result.charts.status;
                 }
             }
+            return true;
         } catch (e) { console.error("Error loading dashboard data", e); }
+        return false;
     }
 
     async renderCharts() {
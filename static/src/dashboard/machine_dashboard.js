@@ -2,8 +2,9 @@
 
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
-import { Component, onWillStart, useRef, onMounted } from "@odoo/owl";
+import { Component, onWillStart, useRef, onMounted, onWillUnmount, useState } from "@odoo/owl";
 import { loadBundle } from "@web/core/assets";
+import { AUTO_REFRESH_INTERVAL } from "./dashboard";
 
 export class MachineDashboard extends Component {
     setup() {
@@ -12,10 +13,12 @@ export class MachineDashboard extends Component {
         this.chartManRef = useRef("chart_manufacturer");
         this.chartCatRef = useRef("chart_category");
 
-        this.state = {
+        this.state = useState({
             kpi: { total: 0, compliant: 0, non_compliant: 0, manufacturers: 0 },
             lists: { non_compliant: [] }
-        };
+        });
+        this.version = null;
+        this.charts = [];
 
         onWillStart(async () => {
             await loadBundle("web.chartjs_lib");
@@ -24,19 +27,38 @@ export class MachineDashboard extends Component {
 
         onMounted(async () => {
             await this.renderCharts();
+            this.refreshTimer = setInterval(() => this.refresh(), AUTO_REFRESH_INTERVAL);
+        });
+        onWillUnmount(() => {
+            clearInterval(this.refreshTimer);
+            this.charts.forEach((chart) => chart.destroy());
         });
     }
 
+    async refresh() {
+        if (document.hidden) return;
+        if (await this.loadData()) {
+            await this.renderCharts();
+        }
+    }
+
+    // Returns true when new data was received
     async loadData() {
-        const result = await this.orm.call("inspection.machine", "get_machine_dashboard_stats", []);
+        const payload = await this.orm.call("inspection.inspection", "get_dashboard_payload", ["machine", this.version]);
+        this.version = payload.version;
+        if (payload.not_modified) return false;
+        const result = payload.data;
         this.state.kpi = result.kpi;
         this.state.lists = result.lists;
         this.chartData = result.charts;
+        return true;
     }
 
     async renderCharts() {
+        this.charts.forEach((chart) => chart.destroy());
+        this.charts = [];
         if (this.chartManRef.el) {
-            new Chart(this.chartManRef.el, {
+            this.charts.push(new Chart(this.chartManRef.el, {
                 type: 'doughnut',
                 data: {
                     labels: this.chartData.manufacturer.labels,
@@ -51,11 +73,11 @@ export class MachineDashboard extends Component {
                     maintainAspectRatio: false,
                     plugins: { legend: { position: 'bottom' }, title: { display: true, text: 'Top Manufacturers' } }
                 }
-            });
+            }));
         }
 
         if (this.chartCatRef.el) {
-            new Chart(this.chartCatRef.el, {
+            this.charts.push(new Chart(this.chartCatRef.el, {
                 type: 'bar',
                 data: {
                     labels: this.chartData.category.labels,
@@ -71,7 +93,7 @@ export class MachineDashboard extends Component {
                     plugins: { legend: { display: false }, title: { display: true, text: 'Fleet by Category' } },
                     scales: { y: { beginAtZero: true } }
                 }
-            });
+            }));
         }
     }
 
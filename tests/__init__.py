@@ -0,0 +1,2 @@
+from . import test_dashboard_query_count
+from . import test_index_plans
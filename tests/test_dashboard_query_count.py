@@ -0,0 +1,56 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestDashboardQueryCount(TransactionCase):
+    """ The dashboard payloads must cost the same number of queries whatever the data volume """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.category = cls.env['inspection.category'].create({'name': 'Lifting Equipment'})
+        cls.customer = cls.env['res.partner'].create({'name': 'Fleet Customer'})
+
+    def _create_fleet(self, size):
+        """ ``size`` inspectors, each with a machine and a passed, a failed and a draft inspection """
+        inspectors = self.env['res.users'].create([{
+            'name': f'Inspector {size}-{i}',
+            'login': f'inspector_{size}_{i}',
+            'groups_id': [(6, 0, self.env.ref('base.group_user').ids)],
+        } for i in range(size)])
+        machines = self.env['inspection.machine'].create([{
+            'name': f'Crane {size}-{i}',
+            'serial_number': f'SN-{size}-{i}',
+            'manufacturer': f'Maker {i % 7}',
+            'partner_id': self.customer.id,
+            'category_id': self.category.id,
+        } for i in range(size)])
+        self.env['inspection.inspection'].create([{
+            'machine_id': machine.id,
+            'customer_id': self.customer.id,
+            'inspector_id': inspector.id,
+            'status': status,
+        } for machine, inspector in zip(machines, inspectors) for status in ('passed', 'failed', 'draft')])
+        self.env.flush_all()
+
+    def _count_queries(self, method):
+        self.env.invalidate_all()
+        before = self.cr.sql_log_count
+        method()
+        return self.cr.sql_log_count - before
+
+    def _assert_flat_query_count(self, method):
+        self._create_fleet(5)
+        method()  # warm the registry caches
+        expected = self._count_queries(method)
+
+        self._create_fleet(50)
+        self.env.invalidate_all()
+        with self.assertQueryCount(expected):
+            method()
+
+    def test_main_dashboard_inspector_tracking(self):
+        self._assert_flat_query_count(self.env['inspection.inspection'].get_dashboard_stats)
+
+    def test_machine_dashboard(self):
+        self._assert_flat_query_count(self.env['inspection.machine'].get_machine_dashboard_stats)
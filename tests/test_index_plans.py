@@ -0,0 +1,70 @@
+import base64
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+
+
+@tagged('post_install', '-at_install')
+class TestIndexPlans(TransactionCase):
+    """ The portal queries must be able to use the indexes declared in init().
+
+    Sequential scans are disabled so the plan shows whether an index can serve the query,
+    whatever the (small) size of the test tables.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.customer = cls.env['res.partner'].create({'name': 'Plan Customer'})
+        category = cls.env['inspection.category'].create({'name': 'Lifting Equipment'})
+        machines = cls.env['inspection.machine'].create([{
+            'name': f'Crane {i}',
+            'serial_number': f'SN-{i}',
+            'partner_id': cls.customer.id,
+            'category_id': category.id,
+        } for i in range(20)])
+        cls.env['inspection.inspection'].create([{
+            'machine_id': machine.id,
+            'customer_id': cls.customer.id,
+        } for machine in machines])
+        for i in range(20):
+            cls.env['inspection.document'].create({
+                'name': f'Report {i}',
+                'file': base64.b64encode(b'%PDF-1.4'),
+                'partner_id': cls.customer.id,
+            })
+        cls.env.flush_all()
+
+    def setUp(self):
+        super().setUp()
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+        self.addCleanup(self.env.cr.execute, "RESET enable_seqscan")
+
+    def _explain(self, model, domain, order):
+        query = self.env[model]._search(domain, order=order, limit=16)
+        self.env.cr.execute(SQL("EXPLAIN %s", query.select()))
+        return '\n'.join(row[0] for row in self.env.cr.fetchall())
+
+    def test_portal_inspections_list(self):
+        plan = self._explain('inspection.inspection', [('customer_id', '=', self.customer.id)],
+                             'start_date desc, id desc')
+        self.assertIn('inspection_inspection_customer_date_idx', plan)
+
+    def test_portal_machines_list(self):
+        plan = self._explain('inspection.machine', [('partner_id', '=', self.customer.id)], 'id asc')
+        self.assertIn('inspection_machine_partner_id_id_idx', plan)
+
+    def test_portal_documents_list(self):
+        plan = self._explain('inspection.document', [('partner_id', '=', self.customer.id)],
+                             'upload_date desc nulls last, id desc')
+        self.assertIn('inspection_document_partner_date_idx', plan)
+
+    def test_portal_search(self):
+        if not self.env.registry.has_trigram:
+            self.skipTest("pg_trgm is not installed")
+        # GIN indexes only do bitmap scans: keep the planner from walking the primary key instead
+        self.env.cr.execute("SET LOCAL enable_indexscan = off")
+        self.addCleanup(self.env.cr.execute, "RESET enable_indexscan")
+        for model in ('inspection.inspection', 'inspection.machine'):
+            plan = self._explain(model, [('search_text', 'ilike', 'crane 1')], 'id desc')
+            self.assertIn(f"{self.env[model]._table}_search_text_trgm_idx", plan)